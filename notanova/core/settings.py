@@ -132,6 +132,17 @@ class SettingsManager(QObject):
             # self.q_settings.sync() # Sync can be deferred, happens on destruction or explicitly
             self.settingsChanged.emit(key)
 
+    def sync(self):
+        """Flushes pending writes to the settings file."""
+        self.q_settings.sync()
+
+    def snapshot(self) -> dict:
+        """Returns every known setting as a plain dict (one get() per key).
+
+        Take it once and reuse it; each call reads every key again.
+        """
+        return {key: self.get(key) for key in DEFAULT_SETTINGS}
+
     def get_font(self) -> QFont:
         """Get the configured editor font."""
         font = QFont()
@@ -0,0 +1,101 @@
+import os
+import functools
+from PyQt6.QtWidgets import QApplication, QStyle
+from PyQt6.QtGui import QIcon, QPixmap, QColor
+
+# Shared icon lookup for the whole UI (themed icons, then assets/icons, then Qt standard pixmaps).
+# Every resolution is cached per process, so toolbars, menus, the tree and dialogs share one QIcon per name.
+
+# Local icon assets: go up one level from 'ui' to project root, then to 'assets/icons'
+_ASSETS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'assets', 'icons'))
+
+def _index_assets(assets_dir: str) -> dict:
+    """Maps icon name -> file path for the local assets (.png preferred over .svg), with one directory scan."""
+    index = {}
+    try:
+        with os.scandir(assets_dir) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                if ext == '.png' and entry.is_file(): index[stem] = entry.path
+                elif ext == '.svg' and entry.is_file(): index.setdefault(stem, entry.path)
+    except OSError as e: print(f"Warning: Error finding local assets path: {e}")
+    return index
+
+_ASSET_INDEX = _index_assets(_ASSETS_DIR)
+
+# Fallback 2 of get_icon: fallback name -> Qt standard pixmap
+_SP_MAP = { "document-new": QStyle.StandardPixmap.SP_FileIcon, "document-save": QStyle.StandardPixmap.SP_DialogSaveButton,
+            "document-save-as": QStyle.StandardPixmap.SP_DialogSaveButton, "document-open": QStyle.StandardPixmap.SP_DialogOpenButton,
+            "document-export": QStyle.StandardPixmap.SP_ArrowRight, "folder-new": QStyle.StandardPixmap.SP_FileDialogNewFolder,
+            "folder-open": QStyle.StandardPixmap.SP_DirOpenIcon, "application-exit": QStyle.StandardPixmap.SP_DialogCloseButton,
+            "edit-undo": QStyle.StandardPixmap.SP_ArrowBack, "edit-redo": QStyle.StandardPixmap.SP_ArrowForward,
+            "edit-cut": QStyle.StandardPixmap.SP_ToolBarCutButton, "edit-copy": QStyle.StandardPixmap.SP_ToolBarCopyButton,
+            "edit-paste": QStyle.StandardPixmap.SP_ToolBarPasteButton, "edit-select-all": QStyle.StandardPixmap.SP_DialogResetButton,
+            "edit-rename": QStyle.StandardPixmap.SP_LineEditClearButton, "edit-delete": QStyle.StandardPixmap.SP_TrashIcon,
+            "edit-repair": QStyle.StandardPixmap.SP_DialogApplyButton, "format-text-bold": QStyle.StandardPixmap.SP_ToolBarBoldButton,
+            "format-text-italic": QStyle.StandardPixmap.SP_ToolBarItalicButton, "format-text-strikethrough": QStyle.StandardPixmap.SP_DialogCancelButton,
+            "format-text-code": QStyle.StandardPixmap.SP_ComputerIcon, "format-list-unordered": QStyle.StandardPixmap.SP_ToolBarUnorderedListButton,
+            "format-list-ordered": QStyle.StandardPixmap.SP_ToolBarOrderedListButton, "format-indent-more": QStyle.StandardPixmap.SP_ToolBarIndentButton,
+            "format-justify-fill": QStyle.StandardPixmap.SP_ToolBarJustifyButton, "insert-link": QStyle.StandardPixmap.SP_ToolBarLinkButton,
+            "insert-image": QStyle.StandardPixmap.SP_DriveHDIcon, "insert-table": QStyle.StandardPixmap.SP_FileDialogDetailedView,
+            "insert-code-block": QStyle.StandardPixmap.SP_FileDialogContentsView, "insert-horizontal-rule": QStyle.StandardPixmap.SP_ToolBarHorizontalExtensionButton,
+            "insert-object": QStyle.StandardPixmap.SP_FileDialogNewFolder, "applications-science": QStyle.StandardPixmap.SP_ComputerIcon,
+            "media-record": QStyle.StandardPixmap.SP_MediaPlay, "audio-input-microphone": QStyle.StandardPixmap.SP_MediaVolume,
+            "media-playback-stop": QStyle.StandardPixmap.SP_MediaStop, "tools-check-spelling": QStyle.StandardPixmap.SP_DialogHelpButton,
+            "cloud": QStyle.StandardPixmap.SP_CloudIcon, "network-server": QStyle.StandardPixmap.SP_DriveNetIcon,
+            "cloud-auth": QStyle.StandardPixmap.SP_ComputerIcon, "preferences-system-network": QStyle.StandardPixmap.SP_NetworkIcon,
+            "cloud-download": QStyle.StandardPixmap.SP_ArrowDown, "folder-download": QStyle.StandardPixmap.SP_ArrowDown,
+            "cloud-upload": QStyle.StandardPixmap.SP_ArrowUp, "folder-upload": QStyle.StandardPixmap.SP_ArrowUp,
+            "preferences-system": QStyle.StandardPixmap.SP_ComputerIcon, "preferences-desktop-theme": QStyle.StandardPixmap.SP_DesktopIcon,
+            "preferences-desktop-font": QStyle.StandardPixmap.SP_DesktopIcon, "folder-saved-search": QStyle.StandardPixmap.SP_DirLinkIcon,
+            "view-task": QStyle.StandardPixmap.SP_DialogYesButton, "checkbox": QStyle.StandardPixmap.SP_DialogYesButton,
+            "help-about": QStyle.StandardPixmap.SP_MessageBoxInformation, "help-about-qt": QStyle.StandardPixmap.SP_DesktopIcon,
+            "code-context": QStyle.StandardPixmap.SP_ComputerIcon, "code-block-tag": QStyle.StandardPixmap.SP_FileDialogContentsView,
+            "horizontal-line": QStyle.StandardPixmap.SP_ToolBarHorizontalExtensionButton, "list-add": QStyle.StandardPixmap.SP_FileDialogNewFolder,
+            "system-run": QStyle.StandardPixmap.SP_ComputerIcon, "audio-card": QStyle.StandardPixmap.SP_MediaVolume, # Placeholder for Audio Card
+            "folder": QStyle.StandardPixmap.SP_DirIcon, # For NotebookTree
+            "text-markdown": QStyle.StandardPixmap.SP_FileIcon, # For NotebookTree
+            "text-x-generic": QStyle.StandardPixmap.SP_FileIcon, # Fallback
+            "folder-symbolic": QStyle.StandardPixmap.SP_DirIcon, # Fallback
+}
+_SP_ICON_CACHE = {} # StandardPixmap -> QIcon, filled on first use
+_CLEAR_HOOKS = [] # Clear callbacks of caches built on top of get_icon (see register_clear_hook)
+
+@functools.cache
+def _placeholder_icon() -> QIcon:
+    """Gray square shared by every unresolved name (built on first use, QPixmap needs a QGuiApplication)."""
+    pixmap = QPixmap(16, 16); pixmap.fill(QColor("#cccccc")); return QIcon(pixmap)
+
+
+@functools.lru_cache(maxsize=None) # Theme/asset lookups happen once per name; QIcon is copied by setIcon, so sharing is safe
+def get_icon(name: str, fallback_name: str = None) -> QIcon:
+    """Loads an icon using QIcon.fromTheme, with fallback path or standard pixmap."""
+    icon = QIcon.fromTheme(name)
+    if not icon.isNull(): return icon
+    # Fallback 1: Local assets/icons (indexed once at import, no per-call stat)
+    if ipath := _ASSET_INDEX.get(name): return QIcon(ipath)
+
+    # Fallback 2: Standard Pixmap from Qt Style
+    sp_enum = _SP_MAP.get(fallback_name) if fallback_name else None
+    if sp_enum is not None:
+        icon = _SP_ICON_CACHE.get(sp_enum) # Many names share one standard pixmap
+        if icon is None and (app := QApplication.instance()) is not None:
+            style = app.style()
+            if style is None: print("Warning: QApplication style not available for standard pixmap.")
+            elif not (pixmap := style.standardPixmap(sp_enum)).isNull(): icon = _SP_ICON_CACHE[sp_enum] = QIcon(pixmap)
+        if icon is not None: return icon
+
+    # Final fallback: Simple placeholder
+    print(f"Icon '{name}' (fallback '{fallback_name}') not found. Using placeholder.")
+    return _placeholder_icon()
+
+
+def register_clear_hook(clear) -> None:
+    """Registers a callable run by clear_icon_caches, for modules that keep their own icons from get_icon."""
+    _CLEAR_HOOKS.append(clear)
+
+
+def clear_icon_caches() -> None:
+    """Drops every cached icon (e.g. after a theme change) so the next lookups resolve against the new theme."""
+    get_icon.cache_clear(); _SP_ICON_CACHE.clear(); _placeholder_icon.cache_clear()
+    for clear in _CLEAR_HOOKS: clear()
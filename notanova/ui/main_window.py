@@ -4,6 +4,7 @@ import json
 import uuid
 import re
 import time
+from pathlib import Path
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QTabWidget, QDockWidget, QMessageBox, QStatusBar,
                              QLabel, QFileDialog, QSplitter, QApplication,
@@ -12,12 +13,13 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
 from PyQt6.QtGui import (QAction, QIcon, QKeySequence, QCloseEvent, QFont, QGuiApplication,
                          QActionGroup, QPalette, QTextCursor)
 from PyQt6.QtCore import (Qt, QSize, QTimer, QUrl, QSettings, QStandardPaths, QPoint,
-                          QByteArray, QCoreApplication, pyqtSlot)
+                          QByteArray, QCoreApplication, QSignalBlocker, pyqtSlot)
 
 from ui.notebook_tree import NotebookTree, ITEM_ID_ROLE, ITEM_TYPE_ROLE, NOTE_FILE_PATH_ROLE
 from ui.editor_widget import EditorWidget
 from ui.settings_dialog import SettingsDialog
-from ui.toolbar import create_main_toolbar, load_icon
+from ui.toolbar import create_main_toolbar
+from ui.icon_cache import get_icon, clear_icon_caches
 
 from core.settings import settings_manager, APP_NAME, ORG_NAME
 from core.cloud_sync import GoogleDriveSync, gdrive_mapper
@@ -32,11 +34,13 @@ class MainWindow(QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle(f"{APP_NAME} - AI Markdown Notes")
-        self.setWindowIcon(load_icon("notanova-logo", "text-x-generic"))
+        self.setWindowIcon(get_icon("notanova-logo", "text-x-generic"))
         self._rename_context = {"item_id": None, "old_name": None}
         self._instruct_ai_context = {"start": -1, "end": -1, "editor": None}
         self._ai_progress_dialog = None # Progress dialog for *LLM* tasks ONLY
         self._active_ai_manager = None # Track which manager is running for cancellation
+        self._default_save_dir = None # Cached Path of "default_save_path", refreshed on settings change
+        self._refresh_default_save_dir()
 
         # --- Initialize Core Managers ---
         self.cloud_sync = GoogleDriveSync(self); self.spell_check_manager = SpellCheckManager(self)
@@ -75,7 +79,7 @@ class MainWindow(QMainWindow):
         self.tab_widget.tabCloseRequested.connect(self.close_tab); self.tab_widget.currentChanged.connect(self.on_tab_changed)
         self.notebook_tree.noteOpened.connect(self.open_note_in_tab); self.notebook_tree.noteCreated.connect(self._handle_new_note_item)
         self.notebook_tree.renameEditingStarted.connect(self._store_rename_context); self.notebook_tree.itemRenamed.connect(self._handle_item_renamed)
-        self.notebook_tree.itemDeleted.connect(self._handle_item_deleted); self.notebook_tree.structureChanged.connect(self.notebook_tree.save_notebook_structure)
+        self.notebook_tree.itemDeleted.connect(self._handle_item_deleted); self.notebook_tree.structureChanged.connect(self.notebook_tree.schedule_save)
         settings_manager.settingsChanged.connect(self._handle_settings_change)
         self.cloud_sync.syncError.connect(self.show_status_error); self.cloud_sync.listFilesComplete.connect(self._handle_gdrive_list)
         self.cloud_sync.uploadComplete.connect(self._handle_gdrive_upload); self.cloud_sync.downloadComplete.connect(self._handle_gdrive_download)
@@ -99,43 +103,43 @@ class MainWindow(QMainWindow):
 
     def _create_actions(self):
         # (Action creation code remains the same as previous correct version)
-        self.new_note_action=QAction(load_icon("document-new"),"&New Note",self);self.new_note_action.setShortcut(QKeySequence.StandardKey.New);self.new_note_action.setStatusTip("Create a new note");self.new_note_action.triggered.connect(self.create_new_note_in_tree)
-        self.new_notebook_action=QAction(load_icon("folder-new"),"New &Notebook",self);self.new_notebook_action.setStatusTip("Create a new notebook");self.new_notebook_action.triggered.connect(self.create_new_notebook_in_tree)
-        self.save_note_action=QAction(load_icon("document-save"),"&Save",self);self.save_note_action.setShortcut(QKeySequence.StandardKey.Save);self.save_note_action.setStatusTip("Save the current note");self.save_note_action.triggered.connect(self.save_current_note)
-        self.save_as_action=QAction(load_icon("document-save-as"),"Save &As...",self);self.save_as_action.setShortcut(QKeySequence.StandardKey.SaveAs);self.save_as_action.setStatusTip("Save the current note with a new name or location");self.save_as_action.triggered.connect(self.save_current_note_as)
-        self.export_action_menu=QMenu(self);self.export_action=QAction(load_icon("document-export"),"&Export As...",self);self.export_action.setStatusTip("Export the current note to another format");self.export_action.setMenu(self.export_action_menu)
-        self.settings_action=QAction(load_icon("configure","preferences-system"),"&Settings...",self);self.settings_action.setShortcut(QKeySequence.StandardKey.Preferences);self.settings_action.setStatusTip("Configure application settings");self.settings_action.triggered.connect(self.show_settings_dialog)
-        self.exit_action=QAction(load_icon("application-exit"),"E&xit",self);self.exit_action.setShortcut(QKeySequence.StandardKey.Quit);self.exit_action.setStatusTip("Exit the application");self.exit_action.triggered.connect(self.close)
-        self.undo_action=QAction(load_icon("edit-undo"),"&Undo",self);self.undo_action.setShortcut(QKeySequence.StandardKey.Undo);self.undo_action.triggered.connect(lambda:self.current_editor_widget().undo() if self.current_editor_widget() else None)
-        self.redo_action=QAction(load_icon("edit-redo"),"&Redo",self);self.redo_action.setShortcut(QKeySequence.StandardKey.Redo);self.redo_action.triggered.connect(lambda:self.current_editor_widget().redo() if self.current_editor_widget() else None)
-        self.cut_action=QAction(load_icon("edit-cut"),"Cu&t",self);self.cut_action.setShortcut(QKeySequence.StandardKey.Cut);self.cut_action.triggered.connect(lambda:self.current_editor_widget().cut() if self.current_editor_widget() else None)
-        self.copy_action=QAction(load_icon("edit-copy"),"&Copy",self);self.copy_action.setShortcut(QKeySequence.StandardKey.Copy);self.copy_action.triggered.connect(lambda:self.current_editor_widget().copy() if self.current_editor_widget() else None)
-        self.paste_action=QAction(load_icon("edit-paste"),"&Paste",self);self.paste_action.setShortcut(QKeySequence.StandardKey.Paste);self.paste_action.triggered.connect(lambda:self.current_editor_widget().paste() if self.current_editor_widget() else None)
-        self.select_all_action=QAction(load_icon("edit-select-all"),"Select &All",self);self.select_all_action.setShortcut(QKeySequence.StandardKey.SelectAll);self.select_all_action.triggered.connect(lambda:self.current_editor_widget().selectAll() if self.current_editor_widget() else None)
-        self.bold_action=QAction(load_icon("format-text-bold"),"&Bold",self);self.bold_action.setShortcut(QKeySequence.StandardKey.Bold);self.bold_action.triggered.connect(lambda:self.current_editor_widget().format_bold() if self.current_editor_widget() else None)
-        self.italic_action=QAction(load_icon("format-text-italic"),"&Italic",self);self.italic_action.setShortcut(QKeySequence.StandardKey.Italic);self.italic_action.triggered.connect(lambda:self.current_editor_widget().format_italic() if self.current_editor_widget() else None)
-        self.strikethrough_action=QAction(load_icon("format-text-strikethrough"),"&Strikethrough",self);self.strikethrough_action.setShortcut(QKeySequence("Ctrl+Shift+S"));self.strikethrough_action.triggered.connect(lambda:self.current_editor_widget().format_strikethrough() if self.current_editor_widget() else None)
-        self.inline_code_action=QAction(load_icon("format-text-code","code-context"),"Inline &Code",self);self.inline_code_action.setShortcut(QKeySequence("Ctrl+`"));self.inline_code_action.triggered.connect(lambda:self.current_editor_widget().format_inline_code() if self.current_editor_widget() else None)
+        self.new_note_action=QAction(get_icon("document-new"),"&New Note",self);self.new_note_action.setShortcut(QKeySequence.StandardKey.New);self.new_note_action.setStatusTip("Create a new note");self.new_note_action.triggered.connect(self.create_new_note_in_tree)
+        self.new_notebook_action=QAction(get_icon("folder-new"),"New &Notebook",self);self.new_notebook_action.setStatusTip("Create a new notebook");self.new_notebook_action.triggered.connect(self.create_new_notebook_in_tree)
+        self.save_note_action=QAction(get_icon("document-save"),"&Save",self);self.save_note_action.setShortcut(QKeySequence.StandardKey.Save);self.save_note_action.setStatusTip("Save the current note");self.save_note_action.triggered.connect(self.save_current_note)
+        self.save_as_action=QAction(get_icon("document-save-as"),"Save &As...",self);self.save_as_action.setShortcut(QKeySequence.StandardKey.SaveAs);self.save_as_action.setStatusTip("Save the current note with a new name or location");self.save_as_action.triggered.connect(self.save_current_note_as)
+        self.export_action_menu=QMenu(self);self.export_action=QAction(get_icon("document-export"),"&Export As...",self);self.export_action.setStatusTip("Export the current note to another format");self.export_action.setMenu(self.export_action_menu)
+        self.settings_action=QAction(get_icon("configure","preferences-system"),"&Settings...",self);self.settings_action.setShortcut(QKeySequence.StandardKey.Preferences);self.settings_action.setStatusTip("Configure application settings");self.settings_action.triggered.connect(self.show_settings_dialog)
+        self.exit_action=QAction(get_icon("application-exit"),"E&xit",self);self.exit_action.setShortcut(QKeySequence.StandardKey.Quit);self.exit_action.setStatusTip("Exit the application");self.exit_action.triggered.connect(self.close)
+        self.undo_action=QAction(get_icon("edit-undo"),"&Undo",self);self.undo_action.setShortcut(QKeySequence.StandardKey.Undo);self.undo_action.triggered.connect(lambda:self.current_editor_widget().undo() if self.current_editor_widget() else None)
+        self.redo_action=QAction(get_icon("edit-redo"),"&Redo",self);self.redo_action.setShortcut(QKeySequence.StandardKey.Redo);self.redo_action.triggered.connect(lambda:self.current_editor_widget().redo() if self.current_editor_widget() else None)
+        self.cut_action=QAction(get_icon("edit-cut"),"Cu&t",self);self.cut_action.setShortcut(QKeySequence.StandardKey.Cut);self.cut_action.triggered.connect(lambda:self.current_editor_widget().cut() if self.current_editor_widget() else None)
+        self.copy_action=QAction(get_icon("edit-copy"),"&Copy",self);self.copy_action.setShortcut(QKeySequence.StandardKey.Copy);self.copy_action.triggered.connect(lambda:self.current_editor_widget().copy() if self.current_editor_widget() else None)
+        self.paste_action=QAction(get_icon("edit-paste"),"&Paste",self);self.paste_action.setShortcut(QKeySequence.StandardKey.Paste);self.paste_action.triggered.connect(lambda:self.current_editor_widget().paste() if self.current_editor_widget() else None)
+        self.select_all_action=QAction(get_icon("edit-select-all"),"Select &All",self);self.select_all_action.setShortcut(QKeySequence.StandardKey.SelectAll);self.select_all_action.triggered.connect(lambda:self.current_editor_widget().selectAll() if self.current_editor_widget() else None)
+        self.bold_action=QAction(get_icon("format-text-bold"),"&Bold",self);self.bold_action.setShortcut(QKeySequence.StandardKey.Bold);self.bold_action.triggered.connect(lambda:self.current_editor_widget().format_bold() if self.current_editor_widget() else None)
+        self.italic_action=QAction(get_icon("format-text-italic"),"&Italic",self);self.italic_action.setShortcut(QKeySequence.StandardKey.Italic);self.italic_action.triggered.connect(lambda:self.current_editor_widget().format_italic() if self.current_editor_widget() else None)
+        self.strikethrough_action=QAction(get_icon("format-text-strikethrough"),"&Strikethrough",self);self.strikethrough_action.setShortcut(QKeySequence("Ctrl+Shift+S"));self.strikethrough_action.triggered.connect(lambda:self.current_editor_widget().format_strikethrough() if self.current_editor_widget() else None)
+        self.inline_code_action=QAction(get_icon("format-text-code","code-context"),"Inline &Code",self);self.inline_code_action.setShortcut(QKeySequence("Ctrl+`"));self.inline_code_action.triggered.connect(lambda:self.current_editor_widget().format_inline_code() if self.current_editor_widget() else None)
         self.heading_actions=[QAction(f"Heading {i}",self) for i in range(1,7)]; [act.triggered.connect(lambda c=False,l=i+1:self.apply_heading_from_toolbar(l)) for i,act in enumerate(self.heading_actions)]
-        self.bullet_list_action=QAction(load_icon("format-list-unordered"),"&Bullet List",self);self.bullet_list_action.setShortcut(QKeySequence("Ctrl+Shift+8"));self.bullet_list_action.triggered.connect(lambda:self.current_editor_widget().format_bullet_list() if self.current_editor_widget() else None)
-        self.numbered_list_action=QAction(load_icon("format-list-ordered"),"&Numbered List",self);self.numbered_list_action.setShortcut(QKeySequence("Ctrl+Shift+7"));self.numbered_list_action.triggered.connect(lambda:self.current_editor_widget().format_numbered_list() if self.current_editor_widget() else None)
-        self.blockquote_action=QAction(load_icon("format-indent-more"),"Bloc&kquote",self);self.blockquote_action.setShortcut(QKeySequence("Ctrl+'"));self.blockquote_action.triggered.connect(lambda:self.current_editor_widget().format_blockquote() if self.current_editor_widget() else None)
-        self.checkbox_action=QAction(load_icon("checkbox","view-task"),"Checkbox &List Item",self);self.checkbox_action.setShortcut(QKeySequence("Ctrl+Shift+L"));self.checkbox_action.triggered.connect(lambda:self.current_editor_widget().insert_checkbox() if self.current_editor_widget() else None)
-        self.link_action=QAction(load_icon("insert-link"),"Insert &Link",self);self.link_action.setShortcut(QKeySequence(Qt.Modifier.CTRL|Qt.Key.Key_K));self.link_action.triggered.connect(lambda:self.current_editor_widget().insert_link() if self.current_editor_widget() else None)
-        self.image_action=QAction(load_icon("insert-image"),"Insert &Image",self);self.image_action.setShortcut(QKeySequence("Ctrl+Shift+I"));self.image_action.triggered.connect(lambda:self.current_editor_widget().insert_image() if self.current_editor_widget() else None)
-        self.table_action=QAction(load_icon("insert-table"),"Insert &Table",self);self.table_action.setShortcut(QKeySequence("Ctrl+Shift+T"));self.table_action.triggered.connect(lambda:self.current_editor_widget().insert_table() if self.current_editor_widget() else None)
-        self.code_block_action=QAction(load_icon("insert-code-block","code-block-tag"),"Insert C&ode Block",self);self.code_block_action.setShortcut(QKeySequence("Ctrl+Shift+C"));self.code_block_action.triggered.connect(lambda:self.current_editor_widget().insert_code_block() if self.current_editor_widget() else None)
-        self.hr_action=QAction(load_icon("insert-horizontal-rule"),"Insert Horizontal &Rule",self);self.hr_action.setShortcut(QKeySequence("Ctrl+Shift+R"));self.hr_action.triggered.connect(lambda:self.current_editor_widget().insert_horizontal_rule() if self.current_editor_widget() else None)
+        self.bullet_list_action=QAction(get_icon("format-list-unordered"),"&Bullet List",self);self.bullet_list_action.setShortcut(QKeySequence("Ctrl+Shift+8"));self.bullet_list_action.triggered.connect(lambda:self.current_editor_widget().format_bullet_list() if self.current_editor_widget() else None)
+        self.numbered_list_action=QAction(get_icon("format-list-ordered"),"&Numbered List",self);self.numbered_list_action.setShortcut(QKeySequence("Ctrl+Shift+7"));self.numbered_list_action.triggered.connect(lambda:self.current_editor_widget().format_numbered_list() if self.current_editor_widget() else None)
+        self.blockquote_action=QAction(get_icon("format-indent-more"),"Bloc&kquote",self);self.blockquote_action.setShortcut(QKeySequence("Ctrl+'"));self.blockquote_action.triggered.connect(lambda:self.current_editor_widget().format_blockquote() if self.current_editor_widget() else None)
+        self.checkbox_action=QAction(get_icon("checkbox","view-task"),"Checkbox &List Item",self);self.checkbox_action.setShortcut(QKeySequence("Ctrl+Shift+L"));self.checkbox_action.triggered.connect(lambda:self.current_editor_widget().insert_checkbox() if self.current_editor_widget() else None)
+        self.link_action=QAction(get_icon("insert-link"),"Insert &Link",self);self.link_action.setShortcut(QKeySequence(Qt.Modifier.CTRL|Qt.Key.Key_K));self.link_action.triggered.connect(lambda:self.current_editor_widget().insert_link() if self.current_editor_widget() else None)
+        self.image_action=QAction(get_icon("insert-image"),"Insert &Image",self);self.image_action.setShortcut(QKeySequence("Ctrl+Shift+I"));self.image_action.triggered.connect(lambda:self.current_editor_widget().insert_image() if self.current_editor_widget() else None)
+        self.table_action=QAction(get_icon("insert-table"),"Insert &Table",self);self.table_action.setShortcut(QKeySequence("Ctrl+Shift+T"));self.table_action.triggered.connect(lambda:self.current_editor_widget().insert_table() if self.current_editor_widget() else None)
+        self.code_block_action=QAction(get_icon("insert-code-block","code-block-tag"),"Insert C&ode Block",self);self.code_block_action.setShortcut(QKeySequence("Ctrl+Shift+C"));self.code_block_action.triggered.connect(lambda:self.current_editor_widget().insert_code_block() if self.current_editor_widget() else None)
+        self.hr_action=QAction(get_icon("insert-horizontal-rule"),"Insert Horizontal &Rule",self);self.hr_action.setShortcut(QKeySequence("Ctrl+Shift+R"));self.hr_action.triggered.connect(lambda:self.current_editor_widget().insert_horizontal_rule() if self.current_editor_widget() else None)
         self.toggle_notebook_tree_action=QAction("Toggle &Notebook Panel",self);self.toggle_notebook_tree_action.setCheckable(True);self.toggle_notebook_tree_action.setChecked(not self.notebook_dock.isHidden());self.toggle_notebook_tree_action.triggered.connect(self.toggle_notebook_panel);self.notebook_dock.visibilityChanged.connect(self.toggle_notebook_tree_action.setChecked)
         self.toggle_toolbar_action=QAction("Toggle &Toolbar",self);self.toggle_toolbar_action.setCheckable(True); # Connected in create_main_toolbar
-        self.fix_text_action=QAction(load_icon("ai-fix-text","edit-repair"),"&Fix Grammar/Style (LLM)",self);self.fix_text_action.setStatusTip("Use LLM to improve selected text or the entire note");self.fix_text_action.triggered.connect(self.run_llm_fix)
-        self.transcribe_action=QAction(load_icon("media-record","audio-input-microphone"),"&Record / Transcribe",self);self.transcribe_action.setStatusTip("Record audio using microphone and transcribe to text");self.transcribe_action.setCheckable(True);self.transcribe_action.triggered.connect(self.toggle_transcription)
-        self.spell_check_action=QAction(load_icon("tools-check-spelling"),"Check &Spelling/Grammar",self);self.spell_check_action.setShortcut(QKeySequence("F7"));self.spell_check_action.setStatusTip("Check spelling and grammar in the current note");self.spell_check_action.triggered.connect(self.run_spell_check)
-        self.gdrive_auth_action=QAction(load_icon("cloud-auth","preferences-system-network"),"&Authenticate Google Drive",self);self.gdrive_auth_action.setStatusTip("Log in to Google Drive to enable cloud sync");self.gdrive_auth_action.triggered.connect(self.cloud_sync.initiate_authentication_flow)
-        self.gdrive_list_action=QAction(load_icon("cloud-download","folder-download"),"&Open from Google Drive",self);self.gdrive_list_action.setStatusTip("List and open notes from Google Drive");self.gdrive_list_action.triggered.connect(self.cloud_sync.list_files)
-        self.gdrive_upload_action=QAction(load_icon("cloud-upload","folder-upload"),"&Save to Google Drive",self);self.gdrive_upload_action.setStatusTip("Upload the current note to Google Drive");self.gdrive_upload_action.triggered.connect(self.upload_current_note_to_gdrive)
-        self.about_action=QAction(load_icon("help-about"),"&About NotaNova",self);self.about_action.setStatusTip("Show information about NotaNova");self.about_action.triggered.connect(self.show_about_dialog)
-        self.about_qt_action=QAction(load_icon("help-about-qt","preferences-system"),"About &Qt",self);self.about_qt_action.setStatusTip("Show information about the Qt framework");self.about_qt_action.triggered.connect(QApplication.instance().aboutQt)
+        self.fix_text_action=QAction(get_icon("ai-fix-text","edit-repair"),"&Fix Grammar/Style (LLM)",self);self.fix_text_action.setStatusTip("Use LLM to improve selected text or the entire note");self.fix_text_action.triggered.connect(self.run_llm_fix)
+        self.transcribe_action=QAction(get_icon("media-record","audio-input-microphone"),"&Record / Transcribe",self);self.transcribe_action.setStatusTip("Record audio using microphone and transcribe to text");self.transcribe_action.setCheckable(True);self.transcribe_action.triggered.connect(self.toggle_transcription)
+        self.spell_check_action=QAction(get_icon("tools-check-spelling"),"Check &Spelling/Grammar",self);self.spell_check_action.setShortcut(QKeySequence("F7"));self.spell_check_action.setStatusTip("Check spelling and grammar in the current note");self.spell_check_action.triggered.connect(self.run_spell_check)
+        self.gdrive_auth_action=QAction(get_icon("cloud-auth","preferences-system-network"),"&Authenticate Google Drive",self);self.gdrive_auth_action.setStatusTip("Log in to Google Drive to enable cloud sync");self.gdrive_auth_action.triggered.connect(self.cloud_sync.initiate_authentication_flow)
+        self.gdrive_list_action=QAction(get_icon("cloud-download","folder-download"),"&Open from Google Drive",self);self.gdrive_list_action.setStatusTip("List and open notes from Google Drive");self.gdrive_list_action.triggered.connect(self.cloud_sync.list_files)
+        self.gdrive_upload_action=QAction(get_icon("cloud-upload","folder-upload"),"&Save to Google Drive",self);self.gdrive_upload_action.setStatusTip("Upload the current note to Google Drive");self.gdrive_upload_action.triggered.connect(self.upload_current_note_to_gdrive)
+        self.about_action=QAction(get_icon("help-about"),"&About NotaNova",self);self.about_action.setStatusTip("Show information about NotaNova");self.about_action.triggered.connect(self.show_about_dialog)
+        self.about_qt_action=QAction(get_icon("help-about-qt","preferences-system"),"About &Qt",self);self.about_qt_action.setStatusTip("Show information about the Qt framework");self.about_qt_action.triggered.connect(QApplication.instance().aboutQt)
 
     def _create_menu_bar(self):
         # (Menu bar creation code remains the same)
@@ -148,7 +152,7 @@ class MainWindow(QMainWindow):
         docx_action = self.export_action_menu.addAction(".docx (Word - needs Pandoc)", lambda: self.export_current_note('docx'))
         docx_action.setEnabled(PANDOC_AVAILABLE); file_menu.addAction(self.export_action)
         file_menu.addSeparator()
-        cloud_menu = file_menu.addMenu(load_icon("cloud", "network-server"), "&Cloud Sync (Google Drive)")
+        cloud_menu = file_menu.addMenu(get_icon("cloud", "network-server"), "&Cloud Sync (Google Drive)")
         cloud_menu.addAction(self.gdrive_auth_action); cloud_menu.addAction(self.gdrive_list_action); cloud_menu.addAction(self.gdrive_upload_action)
         file_menu.addSeparator(); file_menu.addAction(self.settings_action); file_menu.addSeparator(); file_menu.addAction(self.exit_action)
         edit_menu = menu_bar.addMenu("&Edit"); edit_menu.addAction(self.undo_action); edit_menu.addAction(self.redo_action)
@@ -272,8 +276,7 @@ class MainWindow(QMainWindow):
             current_tab_text = self.tab_widget.tabText(index).replace(" *", "")
             # Suggest filename based on tab text, ensuring .md extension
             cname = f"{current_tab_text}.md" if not current_tab_text.lower().endswith(".md") else current_tab_text
-            default_save_dir = settings_manager.get("default_save_path")
-            spath = os.path.join(default_save_dir, cname)
+            spath = str(self._default_save_dir / cname)
 
             new_fpath, selected_filter = QFileDialog.getSaveFileName(self, "Save Note As", spath, "Markdown Files (*.md);;All Files (*)")
             if not new_fpath: return False # User cancelled
@@ -404,7 +407,8 @@ class MainWindow(QMainWindow):
         # Proceed with closing
         print("Saving session and notebook structure before closing...")
         self.save_session()
-        self.notebook_tree.save_notebook_structure()
+        self.notebook_tree.flush_structure_changed() # Schedules a save, including any pending debounced change
+        self.notebook_tree.flush_pending_save() # ...and writes it now
         self.spell_check_manager.cleanup() # Clean up spell checker resources
         self.save_geometry_and_state() # Save window position etc.
         print("Closing application.")
@@ -498,7 +502,7 @@ class MainWindow(QMainWindow):
              print(f"Renamed notebook '{old_name}' to '{new_name}'")
 
         # Save structure regardless of item type after rename
-        self.notebook_tree.save_notebook_structure()
+        self.notebook_tree.schedule_save()
         self.save_session() # Save session in case tab titles changed
 
     def _update_renamed_tab(self, item_id, new_fpath, new_name):
@@ -592,11 +596,21 @@ class MainWindow(QMainWindow):
              self.transcription_manager.transcriptionError.connect(self._handle_transcription_error)
              self.transcription_manager.statusUpdate.connect(self._update_ai_status)
              self._update_ui_state() # Update UI based on new manager state
+        elif key == "default_save_path":
+             self._refresh_default_save_dir()
         elif key in ["llm_model_path", "whisper_model_version", "google_client_secret_path", "spellcheck_engine", "language"]:
              # Update UI state that depends on these settings (e.g., enable/disable actions)
              self._update_ui_state()
 
 
+    def _refresh_default_save_dir(self):
+        """Caches the default save directory as a Path and ensures it exists."""
+        self._default_save_dir = Path(settings_manager.get("default_save_path"))
+        try:
+            self._default_save_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"Warning: Could not create default save directory '{self._default_save_dir}': {e}")
+
     def _apply_theme(self):
         """Applies the current theme or attempts to use system theme."""
         app = QApplication.instance()
@@ -605,6 +619,7 @@ class MainWindow(QMainWindow):
             return
 
         use_system = settings_manager.should_use_system_theme()
+        clear_icon_caches() # Icons resolved from here on follow the new theme/style
 
         if use_system:
             print("Applying System Theme (Clearing QSS)...")
@@ -984,8 +999,11 @@ class MainWindow(QMainWindow):
         editor = self.current_editor_widget();
         if not editor or not self.llm_manager.is_available(): return
 
-        text = editor.editor.textCursor().selectedText()
+        cursor = editor.editor.textCursor() # Capture once; textCursor() returns a copy
+        text = cursor.selectedText()
         is_selection = bool(text)
+        sel_start = cursor.selectionStart()
+        sel_end = cursor.selectionEnd()
         if not text:
             reply = QMessageBox.question(self, "Fix Text", "No text selected. Fix the entire note?",
                                          QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
@@ -1001,8 +1019,8 @@ class MainWindow(QMainWindow):
 
         # Store context for applying the fix
         self._instruct_ai_context = {
-             "start": editor.editor.textCursor().selectionStart() if is_selection else 0,
-             "end": editor.editor.textCursor().selectionEnd() if is_selection else len(editor.get_content()),
+             "start": sel_start if is_selection else 0,
+             "end": sel_end if is_selection else len(text),
              "editor": editor,
              "type": "fix"
         }
@@ -1159,28 +1177,28 @@ class MainWindow(QMainWindow):
 
         # --- Update Transcribe Button State ---
         if hasattr(self, 'transcribe_action'): # Check if action exists
-            if self.transcription_manager.is_available():
+            is_available = self.transcription_manager.is_available()
+            if is_available:
                 is_rec = self.transcription_manager.is_recording()
                 is_transcribing = self.transcription_manager.is_transcribing()
 
-                # Enable button unless actively transcribing
-                self.transcribe_action.setEnabled(not is_transcribing)
-                # Set checked state based on actual recording state
-                self.transcribe_action.setChecked(is_rec)
-
-                # Update icon and tooltip
+                # Compute icon and tooltip before touching the action
                 icon_name = "media-playback-stop" if is_rec else "media-record"
                 fallback = "media-stop" if is_rec else "audio-input-microphone"
-                icon = load_icon(icon_name, fallback)
+                icon = get_icon(icon_name, fallback)
                 tip = "Stop Recording" if is_rec else ("Transcribing..." if is_transcribing else "Record audio and transcribe")
+            else:
+                # Disable if transcription is not available
+                is_rec = is_transcribing = False
+                icon = get_icon("media-record","audio-input-microphone")
+                tip = "Transcription unavailable"
+
+            # Block signals so the bulk update doesn't re-enter toggle_transcription
+            with QSignalBlocker(self.transcribe_action):
+                self.transcribe_action.setEnabled(is_available and not is_transcribing) # Enable button unless actively transcribing
+                self.transcribe_action.setChecked(is_rec) # Reflect actual recording state
                 self.transcribe_action.setIcon(icon)
                 self.transcribe_action.setToolTip(tip)
-            else:
-                 # Disable if transcription is not available
-                 self.transcribe_action.setEnabled(False)
-                 self.transcribe_action.setChecked(False)
-                 self.transcribe_action.setIcon(load_icon("media-record","audio-input-microphone"))
-                 self.transcribe_action.setToolTip("Transcription unavailable")
 
         # --- Manage Progress Dialog *ONLY FOR LLM* ---
         is_llm_busy_status = any(kw in status for kw in ["LLM", "Fixing", "Instructing", "Generating"])
@@ -1265,19 +1283,21 @@ class MainWindow(QMainWindow):
             file_id = selected_file['id']
             file_name = selected_file['name']
 
-            # Determine local save path
-            local_dir = settings_manager.get("default_save_path")
-            os.makedirs(local_dir, exist_ok=True)
-            local_path = os.path.join(local_dir, file_name)
+            # Determine local save path (directory is cached; recreate it if it was removed since startup)
+            try: self._default_save_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                self.show_status_error(f"Could not create save directory '{self._default_save_dir}': {e}")
+                return
+            local_path = self._default_save_dir / file_name
 
             # Ensure .md extension if needed
-            if not local_path.lower().endswith(('.md', '.txt')):
-                 local_path += ".md"
+            if local_path.suffix.lower() not in (".md", ".txt"):
+                 local_path = local_path.with_name(local_path.name + ".md")
 
             # Check for local overwrite
-            if os.path.exists(local_path):
+            if local_path.exists():
                 reply = QMessageBox.question(self, "Confirm Overwrite",
-                                             f"The file '{os.path.basename(local_path)}' already exists locally.\nOverwrite it?",
+                                             f"The file '{local_path.name}' already exists locally.\nOverwrite it?",
                                              QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                              QMessageBox.StandardButton.No)
                 if reply == QMessageBox.StandardButton.No:
@@ -1285,7 +1305,7 @@ class MainWindow(QMainWindow):
                     return
 
             self.show_status_message(f"Downloading '{file_name}' from Google Drive...")
-            self.cloud_sync.download_file(file_id, local_path)
+            self.cloud_sync.download_file(file_id, str(local_path))
 
 
     def _handle_gdrive_download(self, gdrive_id, local_path):
@@ -1299,8 +1319,9 @@ class MainWindow(QMainWindow):
         if item: # Existing item found - update its path and name
             item_id = item.data(ITEM_ID_ROLE)
             print(f"Updating existing tree item {item_id} for GDrive download {gdrive_id}")
-            self.notebook_tree.update_note_metadata(item_id, file_path=local_path, name=note_name)
-            if item.text() != note_name: item.setText(note_name) # Sync tree name
+            with self.notebook_tree.bulk_update(): # Metadata + rename re-sort once
+                self.notebook_tree.update_note_metadata(item_id, file_path=local_path, name=note_name)
+                if item.text() != note_name: item.setText(note_name) # Sync tree name
 
             # Reload the file if it's already open in a tab
             reloaded = False
@@ -1319,7 +1340,8 @@ class MainWindow(QMainWindow):
             print(f"Creating new tree item for GDrive download {gdrive_id}")
             parent_item = self.notebook_tree.get_parent_for_new_item() # Add to root or selected notebook
             new_item_id = str(uuid.uuid4()) # Generate new local ID
-            new_item = self.notebook_tree.create_or_update_note_item(parent_item, new_item_id, note_name, local_path, gdrive_id)
+            with self.notebook_tree.bulk_update(): # One sort/repaint/structureChanged for the pull
+                new_item = self.notebook_tree.create_or_update_note_item(parent_item, new_item_id, note_name, local_path, gdrive_id)
             if new_item:
                  self.open_note_in_tab(local_path, new_item_id) # Open the newly created item
             else:
@@ -4,33 +4,115 @@ import json
 import uuid
 import sys
 import time # For backup file naming
+import weakref
+import bisect
+import struct
+import logging
+from collections import deque
+from contextlib import contextmanager
 from PyQt6.QtWidgets import (QTreeView, QMenu, QMessageBox, QInputDialog,
-                            QSizePolicy, QAbstractItemView, QLineEdit, QStyle, QApplication)
+                            QSizePolicy, QAbstractItemView, QLineEdit, QStyle, QApplication,
+                            QHeaderView)
 from PyQt6.QtGui import (QStandardItemModel, QStandardItem, QIcon, QAction,
                         QDragEnterEvent, QDropEvent, QMouseEvent, QPalette, QPixmap,
                         QPainter, QColor, QFileSystemModel, QStandardItemModel)
 from PyQt6.QtCore import (Qt, pyqtSignal, QModelIndex, QMimeData, QIODevice,
-                         QDataStream, QByteArray, QUrl, QTimer, QDir, QPoint)
+                         QDataStream, QByteArray, QUrl, QTimer, QDir, QPoint,
+                         QObject, QRunnable, QThreadPool, QFile, QBuffer)
+
+try:
+    import orjson # C-accelerated JSON for the structure file
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard # Compresses the structure file on disk
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import send2trash # Imported once here rather than on every delete
+except ImportError:
+    send2trash = None
 
 from core.settings import settings_manager
 # *** ADDED PANDOC_AVAILABLE to import ***
 from logic.exporter import Exporter, PANDOC_AVAILABLE
-from ui.toolbar import load_icon # Use consistent icon loading
+from ui.icon_cache import get_icon, register_clear_hook # Use consistent icon loading
+
+# Routine tree/persistence messages (errors still print); enable DEBUG to see them
+logger = logging.getLogger(__name__)
 
 # MIME type for dragging tree items internally
 NOTEBOOK_ITEM_MIME_TYPE = "application/vnd.notanova.notebookitem"
 
+# zstd frame magic; plain JSON files start with '[' so both formats load
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Binary structure cache written next to the JSON file for fast startup
+STRUCTURE_CACHE_SUFFIX = ".cache"
+_CACHE_MAGIC = 0x4E4E5443 # "NNTC"
+_CACHE_VERSION = 2 # v2: header records the size of the JSON file it mirrors
+_CACHE_HEADER_SIZE = 18 # magic u32 + version u16 + JSON size u64 + node count u32
+_CACHE_MIN_NODE_SIZE = 21 # type u8 + four QString lengths (u32) + child count u32
+
 # Custom item roles
 NOTE_FILE_PATH_ROLE = Qt.ItemDataRole.UserRole + 1
 ITEM_TYPE_ROLE = Qt.ItemDataRole.UserRole + 2 # 'notebook' or 'note'
 ITEM_ID_ROLE = Qt.ItemDataRole.UserRole + 3 # Unique ID for persistence
 GDRIVE_ID_ROLE = Qt.ItemDataRole.UserRole + 4 # Google Drive File ID
+SORT_KEY_ROLE = Qt.ItemDataRole.UserRole + 5 # Casefolded name, the model's sort role
+
+# Roles whose values are mirrored in NotebookTree's lookup indexes
+_INDEXED_ROLES = (ITEM_ID_ROLE, NOTE_FILE_PATH_ROLE, GDRIVE_ID_ROLE)
+# Roles whose values feed the cached tooltip
+_TOOLTIP_ROLES = _INDEXED_ROLES + (ITEM_TYPE_ROLE, Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole)
+
+
+def _path_key(path: str) -> str:
+    """Normalized, case-insensitive key used to index note file paths."""
+    return os.path.normpath(os.path.abspath(path)).lower()
+
+
+def _sort_key(text: str) -> str:
+    """Case-insensitive key used to order siblings in the tree."""
+    return text.casefold()
+
+
+# Resolved icons shared by tree items and every context menu popup
+_ICONS: dict[str, QIcon] = {}
+register_clear_hook(_ICONS.clear) # Theme changes reset these along with the shared icon cache
+_CONTEXT_MENU_ICONS = ("document-new", "folder-new", "edit-rename", "edit-delete",
+                       "document-open", "document-export")
+
+
+def _menu_icon(name: str, fallback_name: str = None) -> QIcon:
+    """Returns the cached icon for name, loading it on first use."""
+    icon = _ICONS.get(name)
+    if icon is None:
+        icon = _ICONS[name] = get_icon(name, fallback_name)
+    return icon
+
 
 class NotebookItem(QStandardItem):
     """Custom item for the notebook tree."""
+    _owner_tree = None # weakref to the NotebookTree keeping the lookup indexes
+
     def __init__(self, text="", item_type="note", file_path=None, item_id=None, gdrive_id=None):
         super().__init__()
-        self._item_type = item_type
+        self._tooltip: str | None = None # Cached ToolTipRole text, rebuilt lazily
+        self._sort_text: str | None = None # Cached SORT_KEY_ROLE value, rebuilt lazily
+        self._norm_path: str | None = None # Normalized file path key, kept in sync by setData
+        self._children_names: set[str] | None = None # Cached child names (see NotebookTree._child_names)
+        # Custom roles live in plain attributes rather than QStandardItem's QVariant role map
+        self._item_type = sys.intern(item_type) if isinstance(item_type, str) else item_type # One shared string per type
+        self._file_path = None
+        self._gdrive_id = None
+        # Plain attributes for hot paths (kept in sync with ITEM_TYPE_ROLE by setData)
+        self.is_notebook = item_type == "notebook"
+        self.is_note = item_type == "note"
         # Ensure item_id is always a string
         self._item_id = str(uuid.uuid4()) if item_id is None else str(item_id)
 
@@ -48,9 +130,11 @@ class NotebookItem(QStandardItem):
         self.setFlags(flags)
 
     def update_icon(self):
-        icon_name = "folder" if self.data(ITEM_TYPE_ROLE) == "notebook" else "text-markdown"
-        fallback = "folder-symbolic" if icon_name == "folder" else "text-x-generic"
-        self.setIcon(load_icon(icon_name, fallback))
+        # Shared icons, loaded once (QIcon is implicitly shared)
+        if self._item_type == "notebook":
+            self.setIcon(_menu_icon("folder", "folder-symbolic"))
+        else:
+            self.setIcon(_menu_icon("text-markdown", "text-x-generic"))
 
     def type(self) -> int:
         # Ensure custom items can handle drops if needed (especially notebooks)
@@ -76,19 +160,45 @@ class NotebookItem(QStandardItem):
             return self._item_id
         if role == ITEM_TYPE_ROLE:
             return self._item_type
+        if role == NOTE_FILE_PATH_ROLE:
+            return self._file_path
+        if role == GDRIVE_ID_ROLE:
+            return self._gdrive_id
+        if role == SORT_KEY_ROLE:
+            if self._sort_text is None: self._sort_text = _sort_key(self.text())
+            return self._sort_text
         if role == Qt.ItemDataRole.ToolTipRole:
-             path = self.data(NOTE_FILE_PATH_ROLE)
-             gid = self.data(GDRIVE_ID_ROLE)
-             tt = f"{self.text()} ({self._item_type})"
-             if path: tt += f"\nPath: {path}"
-             if gid: tt += f"\nGDrive: {gid}"
-             tt += f"\nID: {self._item_id}"
-             return tt
+             if self._tooltip is None:
+                 path = self._file_path
+                 gid = self._gdrive_id
+                 tt = f"{self.text()} ({self._item_type})"
+                 if path: tt += f"\nPath: {path}"
+                 if gid: tt += f"\nGDrive: {gid}"
+                 tt += f"\nID: {self._item_id}"
+                 self._tooltip = tt
+             return self._tooltip
         # Fallback to base class implementation for other roles
         return super().data(role)
 
+    @staticmethod
+    def _compute_norm(path) -> str | None:
+        """Returns the normalized path key for path, or None if unset/invalid."""
+        if not path: return None
+        try:
+            return _path_key(path)
+        except (TypeError, ValueError) as e:
+            print(f"Warning: Invalid note path '{path}': {e}")
+            return None
+
+    def setText(self, text: str):
+        self._tooltip = None; self._sort_text = None # Both derive from the item text
+        super().setText(text)
+
     # Override setData() to handle custom roles and update icon
     def setData(self, value, role: int):
+         old_value = self.data(role) if role in _INDEXED_ROLES else None
+         if role in _TOOLTIP_ROLES:
+             self._tooltip = None; self._sort_text = None # Invalidate cached tooltip/sort key
          if role == ITEM_ID_ROLE:
              self._item_id = str(value) # Ensure ID is stored as string
              # No need to call super for this custom role if not stored by base
@@ -97,12 +207,21 @@ class NotebookItem(QStandardItem):
              if value != self._item_type:
                  # print(f"Warning: Attempt to change item type for ID {self._item_id} ignored.")
                  # return # Or allow if needed, ensure icon updates
-                 self._item_type = value
+                 self._item_type = sys.intern(value) if isinstance(value, str) else value
+                 self.is_notebook = value == "notebook"
+                 self.is_note = value == "note"
                  self.update_icon()
              # No need to call super for this custom role
          elif role == Qt.ItemDataRole.EditRole: # Handle text changes through EditRole
              super().setData(value, role)
              self.setText(str(value)) # Ensure display text is updated
+         elif role == NOTE_FILE_PATH_ROLE:
+             self._file_path = value
+             self._norm_path = self._compute_norm(value) # Normalize once, not per lookup
+             self.emitDataChanged() # Not stored by the base class, so notify the model ourselves
+         elif role == GDRIVE_ID_ROLE:
+             self._gdrive_id = value
+             self.emitDataChanged()
          else:
              # Let the base class handle standard roles (DisplayRole, CheckStateRole, etc.)
              super().setData(value, role)
@@ -111,6 +230,93 @@ class NotebookItem(QStandardItem):
          if role == ITEM_TYPE_ROLE:
              self.update_icon()
 
+         # Keep the owning tree's lookup indexes in sync
+         if role in _INDEXED_ROLES and NotebookItem._owner_tree is not None:
+             tree = NotebookItem._owner_tree()
+             if tree is not None:
+                 tree._on_item_data_changed(self, role, old_value)
+
+
+class _TrashSignals(QObject):
+    """Signals for TrashRunnable (QRunnable is not a QObject)."""
+    error = pyqtSignal(str, str) # file path, error message
+
+
+class TrashRunnable(QRunnable):
+    """Moves files to the system trash on a QThreadPool worker thread."""
+    def __init__(self, paths):
+        super().__init__()
+        self.paths = list(paths)
+        self.signals = _TrashSignals()
+
+    def run(self):
+        for fpath in self.paths:
+            try:
+                print(f"Trashing file: {fpath}")
+                send2trash.send2trash(fpath)
+            except FileNotFoundError:
+                pass # Already gone; one syscall instead of a separate exists() probe
+            except Exception as e:
+                print(f"Error moving file to trash: {fpath} - {e}")
+                self.signals.error.emit(fpath, str(e)) # Delivered queued to the GUI thread
+
+
+def _drag_item_id(mime: QMimeData) -> str:
+    """Decodes the item id carried as raw UTF-8 bytes by an internal drag."""
+    return bytes(mime.data(NOTEBOOK_ITEM_MIME_TYPE)).decode('utf-8', 'ignore')
+
+
+def _json_value(value) -> bytes:
+    """Encodes one JSON scalar (str/None) for the streamed structure writer."""
+    return orjson.dumps(value) if ORJSON_AVAILABLE else json.dumps(value).encode('utf-8')
+
+
+class StructureCodecUnavailable(Exception):
+    """The structure file needs an optional codec (zstandard) that is not installed."""
+
+
+def _decode_structure_file(raw: bytes):
+    """Parses the structure file, decompressing it first if it was written with zstd."""
+    if raw.startswith(_ZSTD_MAGIC):
+        if not ZSTD_AVAILABLE:
+            raise StructureCodecUnavailable("structure file is zstd-compressed but the 'zstandard' package is not installed")
+        try:
+            raw = zstandard.ZstdDecompressor().decompress(raw)
+        except zstandard.ZstdError as e:
+            raise ValueError(f"corrupt zstd structure file: {e}") from e # Handled like bad JSON (backed up)
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+
+def _replace_file(fpath: str, payload: bytes):
+    """Writes payload to fpath via a temp file and an atomic replace."""
+    tpath = fpath + ".tmp" # Save to temp file first
+    with open(tpath, 'wb') as f:
+        f.write(payload)
+    os.replace(tpath, fpath) # Atomic replace if possible
+
+
+class SaveStructureRunnable(QRunnable):
+    """Writes an encoded notebook structure (JSON + binary cache) on a worker thread."""
+    def __init__(self, json_bytes: bytes, cache_bytes: bytes, fpath: str):
+        super().__init__()
+        self.json_bytes = json_bytes # Encoded on the GUI thread; no Qt objects cross over
+        self.cache_bytes = cache_bytes
+        self.fpath = fpath
+
+    def run(self):
+        fpath = self.fpath
+        try:
+            os.makedirs(os.path.dirname(fpath), exist_ok=True) # Ensure directory exists
+            payload = self.json_bytes
+            if ZSTD_AVAILABLE: # Compressed on the worker thread, not the GUI thread
+                payload = zstandard.ZstdCompressor(level=3, write_content_size=True).compress(payload)
+            _replace_file(fpath, payload)
+            # Record the JSON file's final size (known only after compression) in the cache header
+            cache = self.cache_bytes[:6] + struct.pack(">Q", len(payload)) + self.cache_bytes[14:]
+            _replace_file(fpath + STRUCTURE_CACHE_SUFFIX, cache) # Written after the JSON, so it is newer
+        except Exception as e:
+            print(f"Error saving notebook structure to {fpath}: {e}")
+
 
 class NotebookTree(QTreeView):
     """Tree view for managing notebooks and notes."""
@@ -124,8 +330,39 @@ class NotebookTree(QTreeView):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.model = QStandardItemModel(self)
+        self.model.setSortRole(SORT_KEY_ROLE) # sortChildren() orders by casefolded name, like _sorted_row
         self.setModel(self.model)
+        # Hashed lookup indexes (item ID / normalized path / GDrive ID -> item)
+        self._by_id: dict[str, NotebookItem] = {}
+        self._by_path: dict[str, NotebookItem] = {}
+        self._by_gdrive: dict[str, NotebookItem] = {}
+        NotebookItem._owner_tree = weakref.ref(self)
+        # Bulk update state (see bulk_update)
+        self._bulk_depth = 0
+        self._dirty_parents: dict[int, QStandardItem] = {} # id(parent) -> parent needing a sort
+        self._root_child_names: set[str] | None = None # Names cache for top-level items
+        self._main_window = None # Top-level window, resolved on first use
+        self._save_blocked = False # Set while the structure file could not be read; saving would overwrite it
+        # Coalesces bursts of structure changes (each one triggers a save) into one emit
+        self._struct_timer = QTimer(self)
+        self._struct_timer.setSingleShot(True)
+        self._struct_timer.setInterval(50)
+        self._struct_timer.timeout.connect(self.structureChanged)
+        # Coalesces structure saves (full tree walk + JSON dump + disk write) into one per burst
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(500)
+        self._save_timer.timeout.connect(self.save_notebook_structure)
+        self._save_pool = QThreadPool(self)
+        self._save_pool.setMaxThreadCount(1) # One writer: saves never race on the .tmp file
         self.setHeaderHidden(True)
+        # All rows share the same icon size and font, so let the view compute
+        # geometry from a single row instead of querying every item's sizeHint.
+        self.setUniformRowHeights(True)
+        self.setAnimated(False) # No extra paints per expand/collapse (explicit; Qt's default)
+        # Single stretched column: never measure contents to size the section
+        self.header().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.header().setStretchLastSection(True)
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
         self.doubleClicked.connect(self.on_item_double_clicked)
@@ -146,8 +383,66 @@ class NotebookTree(QTreeView):
         self.rename_action.triggered.connect(self.rename_selected_item)
         self.addAction(self.rename_action) # Add action to the widget itself
 
+        for name in _CONTEXT_MENU_ICONS: _menu_icon(name) # Resolve once so the first right-click is cheap
+
         self.load_notebook_structure()
 
+        # Resolved once here (imported late to avoid circularity) instead of on every delete
+        from core.cloud_sync import gdrive_mapper
+        self._gdrive_mapper = gdrive_mapper
+
+    @property
+    def main_window(self):
+        """Top-level window, cached so window() doesn't walk the parent chain each time."""
+        if self._main_window is None:
+            self._main_window = self.window()
+        return self._main_window
+
+    @contextmanager
+    def bulk_update(self):
+        """Batches tree mutations into a single repaint, sort and structureChanged.
+
+        View updates are suspended while the block runs; model signals stay on so the
+        view and persistent indexes track every row change. Parents touched by the
+        creators (or by renames) are sorted once on exit. Nested use is allowed.
+        """
+        if self._bulk_depth == 0:
+            self.setUpdatesEnabled(False)
+        self._bulk_depth += 1
+        try:
+            yield
+        finally:
+            self._bulk_depth -= 1
+            if self._bulk_depth == 0:
+                dirty = list(self._dirty_parents.values())
+                self._dirty_parents.clear()
+                for parent in dirty:
+                    self._invalidate_child_names(parent) # Renames inside the block are not tracked per name
+                    self._sort_if_unsorted(parent)
+                self.setUpdatesEnabled(True)
+                if dirty:
+                    self._struct_timer.start()
+
+    def flush_structure_changed(self):
+        """Emits structureChanged now, dropping any pending debounced emit (e.g. on close)."""
+        self._struct_timer.stop()
+        self.structureChanged.emit()
+
+    def schedule_save(self):
+        """Requests a structure save; (re)starting the timer coalesces rapid changes."""
+        self._save_timer.start()
+
+    def flush_pending_save(self):
+        """Writes a pending debounced save immediately and waits for it (e.g. on close)."""
+        if self._save_timer.isActive():
+            self._save_timer.stop()
+            self.save_notebook_structure()
+        self._save_pool.waitForDone()
+
+    def _mark_dirty(self, parent: QStandardItem):
+        """Records a parent whose children need sorting when the bulk update ends."""
+        self._dirty_parents[id(parent)] = parent
+
     def edit(self, index, trigger=QAbstractItemView.EditTrigger.EditKeyPressed, event=None):
         """Overrides edit to emit signal before editing starts."""
         if index.isValid() and trigger != QAbstractItemView.EditTrigger.NoEditTriggers:
@@ -165,95 +460,155 @@ class NotebookTree(QTreeView):
         if index.isValid():
             item = self.model.itemFromIndex(index)
             if isinstance(item, NotebookItem):
-                type_ = item.data(ITEM_TYPE_ROLE)
-                if type_ == "note":
+                if item.is_note:
                     # Emit signal to open the note in the editor
                     self.noteOpened.emit(item.data(NOTE_FILE_PATH_ROLE), item.data(ITEM_ID_ROLE))
-                elif type_ == "notebook":
+                elif item.is_notebook:
                     # Toggle expansion state
                     self.setExpanded(index, not self.isExpanded(index))
 
     def show_context_menu(self, point: QPoint):
         index = self.indexAt(point)
         menu = QMenu(self)
-        main_window = self.window() # Assumes tree is child of MainWindow
+        main_window = self.main_window # Assumes tree is child of MainWindow
 
         if index.isValid():
             item = self.model.itemFromIndex(index)
             if isinstance(item, NotebookItem):
-                item_type = item.data(ITEM_TYPE_ROLE)
                 item_id = item.data(ITEM_ID_ROLE)
 
-                if item_type == "notebook":
-                    menu.addAction(load_icon("document-new"), "New Note Here", lambda: self.create_new_note(item))
-                    menu.addAction(load_icon("folder-new"), "New Sub-Notebook Here", lambda: self.create_new_notebook(item))
+                if item.is_notebook:
+                    menu.addAction(_menu_icon("document-new"), "New Note Here", lambda: self.create_new_note(item))
+                    menu.addAction(_menu_icon("folder-new"), "New Sub-Notebook Here", lambda: self.create_new_notebook(item))
                     menu.addSeparator()
-                    menu.addAction(load_icon("edit-rename"), "Rename Notebook", self.rename_selected_item)
-                    menu.addAction(load_icon("edit-delete"), "Delete Notebook", self.delete_selected_item)
-                elif item_type == "note":
-                    menu.addAction(load_icon("document-open"), "Open Note", lambda idx=index: self.on_item_double_clicked(idx))
+                    menu.addAction(_menu_icon("edit-rename"), "Rename Notebook", self.rename_selected_item)
+                    menu.addAction(_menu_icon("edit-delete"), "Delete Notebook", self.delete_selected_item)
+                elif item.is_note:
+                    menu.addAction(_menu_icon("document-open"), "Open Note", lambda idx=index: self.on_item_double_clicked(idx))
                     menu.addSeparator()
-                    menu.addAction(load_icon("edit-rename"), "Rename Note", self.rename_selected_item)
-                    menu.addAction(load_icon("edit-delete"), "Delete Note", self.delete_selected_item)
+                    menu.addAction(_menu_icon("edit-rename"), "Rename Note", self.rename_selected_item)
+                    menu.addAction(_menu_icon("edit-delete"), "Delete Note", self.delete_selected_item)
                     menu.addSeparator()
 
                     # --- Export Submenu ---
-                    exp_menu = menu.addMenu(load_icon("document-export"), "Export Note As...")
+                    exp_menu = menu.addMenu(_menu_icon("document-export"), "Export Note As...")
                     fpath = item.data(NOTE_FILE_PATH_ROLE)
-                    content = None
-                    can_exp = False
-
-                    # Try getting content from open editor first
-                    if hasattr(main_window, 'get_editor_content_by_id'):
-                         content = main_window.get_editor_content_by_id(item_id)
-                         if content is not None:
-                             can_exp = True
-
-                    # If not open or content retrieval failed, try reading from file
-                    if not can_exp and fpath and os.path.exists(fpath):
-                        try:
-                            with open(fpath, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                            can_exp = True
-                        except Exception as e:
-                            print(f"Context Menu Export: Error reading file {fpath}: {e}")
-                            exp_menu.addAction("(Read Error)").setEnabled(False)
-
-                    # Handle cases where content couldn't be obtained
-                    if not can_exp and content is None:
+                    # Content is fetched only when an export is picked, not on every right-click
+                    is_open = hasattr(main_window, 'get_editor_content_by_id') and main_window.get_editor_content_by_id(item_id) is not None
+                    if not is_open and not (fpath and os.path.exists(fpath)):
                          exp_menu.addAction("(Note not open or file unreadable)").setEnabled(False)
-
-                    # Add export actions if content is available
-                    if can_exp and content is not None:
-                        exporter = Exporter(self) # Create exporter instance
+                    else:
                         sname = item.text() # Suggested name from item text
-                        spath = fpath # Source path for relative resources
-
-                        exp_menu.addAction(".md", lambda checked=False, c=content, fn=sname: exporter.export_to_md(c, fn + ".md"))
-                        exp_menu.addAction(".html", lambda checked=False, c=content, fn=sname, sp=spath: exporter.export_to_html(c, fn + ".html", sp))
-                        exp_menu.addAction(".pdf", lambda checked=False, c=content, fn=sname, sp=spath: exporter.export_to_pdf(c, fn + ".pdf", sp))
-                        # *** CORRECTED LINE BELOW ***
-                        docx_a = exp_menu.addAction(".docx", lambda checked=False, c=content, fn=sname: exporter.export_to_docx(c, fn + ".docx"))
-                        docx_a.setEnabled(PANDOC_AVAILABLE) # Use imported constant
+                        for fmt in ("md", "html", "pdf", "docx"):
+                            exp_a = exp_menu.addAction(f".{fmt}", lambda checked=False, iid=item_id, fp=fpath, fn=sname, f=fmt: self._export_note(iid, fp, fn, f))
+                            if fmt == "docx": exp_a.setEnabled(PANDOC_AVAILABLE) # Use imported constant
         else:
             # Clicked empty area - allow creating top-level notebook
-            menu.addAction(load_icon("folder-new"), "New Notebook", lambda: self.create_new_notebook(self.model.invisibleRootItem()))
+            menu.addAction(_menu_icon("folder-new"), "New Notebook", lambda: self.create_new_notebook(self.model.invisibleRootItem()))
 
         menu.exec(self.mapToGlobal(point))
 
+    def _export_note(self, item_id: str, fpath: str | None, sname: str, fmt: str):
+        """Exports a note from the context menu, reading its content only now."""
+        main_window = self.main_window
+        content = None
+        # Try getting content from open editor first
+        if hasattr(main_window, 'get_editor_content_by_id'):
+            content = main_window.get_editor_content_by_id(item_id)
+        # If not open, read from file
+        if content is None and fpath:
+            try:
+                with open(fpath, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except Exception as e:
+                print(f"Context Menu Export: Error reading file {fpath}: {e}")
+                QMessageBox.warning(self, "Export Error", f"Could not read note file:\n{e}")
+                return
+        if content is None: return
+
+        exporter = Exporter(self)
+        if fmt == "md": exporter.export_to_md(content, sname + ".md")
+        elif fmt == "html": exporter.export_to_html(content, sname + ".html", fpath)
+        elif fmt == "pdf": exporter.export_to_pdf(content, sname + ".pdf", fpath)
+        elif fmt == "docx": exporter.export_to_docx(content, sname + ".docx")
+
+    # --- Lookup Indexes ---
+
+    def _index_item(self, item: QStandardItem, recursive: bool = True):
+        """Registers an item (and optionally its descendants) in the lookup indexes."""
+        if isinstance(item, NotebookItem):
+            self._by_id[item._item_id] = item
+            if item._norm_path: self._by_path[item._norm_path] = item
+            gid = item._gdrive_id
+            if gid: self._by_gdrive[gid] = item
+        if recursive:
+            for r in range(item.rowCount()):
+                self._index_item(item.child(r))
+
+    def _unindex_item(self, item: QStandardItem):
+        """Removes an item from the lookup indexes (descendants are handled by the caller)."""
+        if not isinstance(item, NotebookItem): return
+        if self._by_id.get(item._item_id) is item:
+            del self._by_id[item._item_id]
+        if item._norm_path and self._by_path.get(item._norm_path) is item:
+            del self._by_path[item._norm_path]
+        gid = item._gdrive_id
+        if gid and self._by_gdrive.get(gid) is item:
+            del self._by_gdrive[gid]
+
+    def _clear_indexes(self):
+        self._by_id.clear(); self._by_path.clear(); self._by_gdrive.clear()
+        self._root_child_names = None
+
+    def _on_item_data_changed(self, item: NotebookItem, role: int, old_value):
+        """Called by NotebookItem.setData to keep indexes in sync for items in the model."""
+        current_id = old_value if role == ITEM_ID_ROLE else item.data(ITEM_ID_ROLE)
+        if self._by_id.get(current_id) is not item:
+            return # Not registered (e.g., still being constructed or a clone)
+        new_value = item.data(role)
+        if role == ITEM_ID_ROLE:
+            del self._by_id[old_value]
+            self._by_id[new_value] = item
+        elif role == NOTE_FILE_PATH_ROLE:
+            old_key = NotebookItem._compute_norm(old_value)
+            if old_key and self._by_path.get(old_key) is item:
+                del self._by_path[old_key]
+            if item._norm_path: self._by_path[item._norm_path] = item
+        elif role == GDRIVE_ID_ROLE:
+            if old_value and self._by_gdrive.get(old_value) is item:
+                del self._by_gdrive[old_value]
+            if new_value: self._by_gdrive[new_value] = item
+
+    def _lookup(self, index: dict, key) -> NotebookItem | None:
+        """Returns the indexed item for key if it is still attached to this model."""
+        item = index.get(key)
+        if item is None: return None
+        try:
+            if item.model() is self.model:
+                return item
+        except RuntimeError: # Underlying C++ item was already deleted
+            pass
+        index.pop(key, None) # Drop the stale entry
+        return None
+
     def find_item_by_id(self, item_id: str) -> NotebookItem | None:
-        """Finds an item in the model by its unique ID using BFS."""
+        """Finds an item in the model by its unique ID (hashed lookup, BFS fallback)."""
         if not item_id: return None
+        item_id = str(item_id) # Ensure comparison with string ID
+        item = self._lookup(self._by_id, item_id)
+        if item is not None: return item
+
         root_item = self.model.invisibleRootItem()
-        queue = [root_item.child(r) for r in range(root_item.rowCount())]
+        queue = deque(root_item.child(r) for r in range(root_item.rowCount()))
         while queue:
-            item = queue.pop(0)
+            item = queue.popleft()
             # Check if item is valid and matches ID
-            if item and isinstance(item, NotebookItem) and item.data(ITEM_ID_ROLE) == str(item_id): # Ensure comparison with string ID
+            if item and isinstance(item, NotebookItem) and item._item_id == item_id:
+                self._index_item(item, recursive=False)
                 return item
             # Add children to queue
             if item and item.hasChildren():
-                queue.extend([item.child(r) for r in range(item.rowCount())])
+                queue.extend(item.child(r) for r in range(item.rowCount()))
         return None # Not found
 
     def find_item_by_path(self, file_path: str) -> NotebookItem | None:
@@ -261,46 +616,44 @@ class NotebookTree(QTreeView):
         if not file_path: return None
         try:
              # Normalize path for reliable comparison
-             norm_path = os.path.normpath(os.path.abspath(file_path)).lower()
+             norm_path = _path_key(file_path)
         except Exception as e:
              print(f"Error normalizing path '{file_path}': {e}")
              return None
+        item = self._lookup(self._by_path, norm_path)
+        if item is not None and item.is_note: return item
 
         root = self.model.invisibleRootItem()
-        queue = [root.child(r) for r in range(root.rowCount())]
+        queue = deque(root.child(r) for r in range(root.rowCount()))
         while queue:
-            item = queue.pop(0)
+            item = queue.popleft()
             if item and isinstance(item, NotebookItem):
-                path_data = item.data(NOTE_FILE_PATH_ROLE)
-                # Check if it's a note and path_data exists
-                if item.data(ITEM_TYPE_ROLE) == "note" and path_data:
-                    try:
-                         item_norm_path = os.path.normpath(os.path.abspath(path_data)).lower()
-                         if item_norm_path == norm_path:
-                             return item
-                    except Exception as e:
-                         # Ignore items with invalid paths stored
-                         print(f"Warning: Skipping item with invalid path '{path_data}': {e}")
-                         pass
+                # Compare against the item's precomputed key (None for invalid/missing paths)
+                if item._norm_path == norm_path and item.is_note:
+                    self._index_item(item, recursive=False)
+                    return item
                 # Add children to queue
                 if item.hasChildren():
-                    queue.extend([item.child(r) for r in range(item.rowCount())])
+                    queue.extend(item.child(r) for r in range(item.rowCount()))
         return None
 
     def find_item_by_gdrive_id(self, gdrive_id: str) -> NotebookItem | None:
         """Finds a note item in the model by its Google Drive ID."""
         if not gdrive_id: return None
+        item = self._lookup(self._by_gdrive, gdrive_id)
+        if item is not None and item.is_note: return item
         root = self.model.invisibleRootItem()
-        queue = [root.child(r) for r in range(root.rowCount())]
+        queue = deque(root.child(r) for r in range(root.rowCount()))
         while queue:
-            item = queue.pop(0)
+            item = queue.popleft()
             if item and isinstance(item, NotebookItem):
                  # Check type and GDrive ID
-                 if item.data(ITEM_TYPE_ROLE) == "note" and item.data(GDRIVE_ID_ROLE) == gdrive_id:
+                 if item.is_note and item._gdrive_id == gdrive_id:
+                     self._index_item(item, recursive=False)
                      return item
                  # Add children
                  if item.hasChildren():
-                     queue.extend([item.child(r) for r in range(item.rowCount())])
+                     queue.extend(item.child(r) for r in range(item.rowCount()))
         return None
 
     def rename_selected_item(self):
@@ -320,26 +673,24 @@ class NotebookTree(QTreeView):
         item_type = item.data(ITEM_TYPE_ROLE)
         item_name = item.text()
 
-        # Collect data for all items to be deleted (the item and its descendants)
+        # Collect data for all items to be deleted (the item and its descendants).
+        # Each item has exactly one parent, so the walk needs no visited set; an explicit
+        # deque instead of recursion keeps very deep trees clear of the recursion limit.
         items_to_delete_data = []
-        queue = [item]
-        processed_ids = set()
+        queue = deque([item])
         while queue:
-             current_item = queue.pop(0)
-             if not current_item or not isinstance(current_item, NotebookItem): continue
-             current_id = current_item.data(ITEM_ID_ROLE)
-             if current_id in processed_ids: continue # Avoid cycles if tree structure is weird
-             processed_ids.add(current_id)
+             current_item = queue.popleft()
+             if not isinstance(current_item, NotebookItem): continue
 
              item_data = {
-                 "id": current_id,
-                 "path": current_item.data(NOTE_FILE_PATH_ROLE) if current_item.data(ITEM_TYPE_ROLE) == 'note' else None,
+                 "id": current_item._item_id,
+                 "path": current_item._file_path if current_item.is_note else None,
                  "name": current_item.text(),
                  "item": current_item # Keep reference for removal
              }
              items_to_delete_data.append(item_data)
              if current_item.hasChildren():
-                 queue.extend([current_item.child(r) for r in range(current_item.rowCount())])
+                 queue.extend(current_item.child(r) for r in range(current_item.rowCount()))
 
         # --- Confirmation Dialog ---
         num_children = len(items_to_delete_data) - 1
@@ -347,8 +698,8 @@ class NotebookTree(QTreeView):
         if item_type == "notebook" and num_children > 0:
             msg += f"\n\nThis will also delete {num_children} note(s) or sub-notebook(s) inside."
 
-        # Check for associated files to be trashed
-        files_to_trash = [d["path"] for d in items_to_delete_data if d["path"] and os.path.exists(d["path"])]
+        # Associated files to be trashed (existence is checked by the trashing pass itself)
+        files_to_trash = [d["path"] for d in items_to_delete_data if d["path"]]
         if files_to_trash:
             msg += "\n\nThe following associated file(s) will be moved to the system trash:"
             # Show only first few files for brevity
@@ -358,61 +709,44 @@ class NotebookTree(QTreeView):
             if len(files_to_trash) > max_files_to_show:
                 msg += f"\n- ... and {len(files_to_trash) - max_files_to_show} more."
 
-        self.window().raise_(); self.window().activateWindow() # Bring window to front
+        self.main_window.raise_(); self.main_window.activateWindow() # Bring window to front
         reply = QMessageBox.question(self, "Confirm Deletion", msg,
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.Cancel,
                                      QMessageBox.StandardButton.Cancel)
         if reply != QMessageBox.StandardButton.Yes:
             return # User cancelled
 
-        # --- Trash Files ---
-        trash_success = True
-        try:
-            import send2trash
-            for fpath in files_to_trash:
-                try:
-                    print(f"Trashing file: {fpath}")
-                    send2trash.send2trash(fpath)
-                except Exception as e:
-                    print(f"Error moving file to trash: {fpath} - {e}")
-                    proceed = QMessageBox.critical(self, "Trash Error",
-                                                   f"Could not move '{os.path.basename(fpath)}' to trash.\nError: {e}\n\nContinue deleting the item from the notebook?",
-                                                   QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                                                   QMessageBox.StandardButton.No)
-                    if proceed == QMessageBox.StandardButton.No:
-                        trash_success = False; break # Abort deletion
-                    # Else: User chose to continue despite trash error
-        except ImportError:
-            print("Warning: 'send2trash' library not found. Files associated with deleted notes will NOT be moved to trash.")
-            # Optionally ask user if they want to proceed without trashing?
-            # reply_no_trash = QMessageBox.warning(self, "Trash Not Available",
-            #                                     "'send2trash' library not found. Files cannot be moved to trash.\n\nDelete item(s) from notebook anyway?",
-            #                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.Cancel,
-            #                                     QMessageBox.StandardButton.Cancel)
-            # if reply_no_trash != QMessageBox.StandardButton.Yes:
-            #     trash_success = False
-            pass # For now, just proceed without trashing if library missing
-
-        if not trash_success:
-            print("Deletion cancelled due to trash error or user choice.")
-            return
-
         # --- Delete from Model and Emit Signals ---
+        # Files are trashed afterwards on a worker thread so the UI doesn't block
         # Remove the top-level item being deleted (removes descendants automatically)
+        for data in items_to_delete_data:
+            self._unindex_item(data["item"])
         parent = item.parent() or self.model.invisibleRootItem()
+        self._invalidate_child_names(parent) # Siblings may share the name; rebuild lazily
         parent.removeRow(item.row())
         print(f"Deleted '{item_name}' (ID: {item_id}) and its children from the tree.")
 
         # Emit signals for each deleted item ID
-        from core.cloud_sync import gdrive_mapper # Import here to avoid circularity
         for data in items_to_delete_data:
             deleted_id = data.get("id")
             if deleted_id:
                 self.itemDeleted.emit(deleted_id)
-                gdrive_mapper.remove_mapping(deleted_id) # Remove GDrive mapping
+                self._gdrive_mapper.remove_mapping(deleted_id) # Remove GDrive mapping
 
-        self.structureChanged.emit() # Signal structure change
+        self._struct_timer.start() # Signal structure change
+
+        # --- Trash Files (off the GUI thread) ---
+        if files_to_trash and send2trash is None:
+            print("Warning: 'send2trash' library not found. Files associated with deleted notes will NOT be moved to trash.")
+        elif files_to_trash:
+            runnable = TrashRunnable(files_to_trash)
+            runnable.signals.error.connect(self._on_trash_error)
+            QThreadPool.globalInstance().start(runnable)
 
+    def _on_trash_error(self, fpath: str, error: str):
+        """Reports a file that could not be moved to trash (the tree item is already gone)."""
+        QMessageBox.warning(self, "Trash Error",
+                            f"Could not move '{os.path.basename(fpath)}' to trash.\nError: {error}\n\nThe note was removed from the notebook; the file is still on disk:\n{fpath}")
 
     def on_item_changed(self, item: QStandardItem):
         """Handle item rename confirmation from model (when editing finishes)."""
@@ -432,34 +766,91 @@ class NotebookTree(QTreeView):
             # Emit signal for MainWindow to handle potential file renaming etc.
             self.itemRenamed.emit(item_id, new_name)
 
-            # Ensure tree remains sorted after rename
+            # Keep the tree sorted: re-sort only if the row's position actually changed.
+            # sortChildren() is a layout change, so expansion, selection and persistent
+            # indexes follow the moved row (take/insert would drop them).
             parent = item.parent() or self.model.invisibleRootItem()
-            parent.sortChildren(0, Qt.SortOrder.AscendingOrder)
+            self._invalidate_child_names(parent) # Old name is unknown here; rebuild lazily
+            if self._bulk_depth: self._mark_dirty(parent); return # Sorted once when the bulk update ends
+            old_row = item.row()
+            if self._sorted_row(parent, new_name, exclude_row=old_row) != old_row:
+                parent.sortChildren(0, Qt.SortOrder.AscendingOrder)
+
+    def _sorted_row(self, parent: QStandardItem, name: str, exclude_row: int = -1) -> int:
+        """Returns the row where name belongs among parent's sorted children.
+
+        exclude_row skips the item's own row, giving its target row once taken out.
+        """
+        keys = [_sort_key(parent.child(r).text()) for r in range(parent.rowCount()) if r != exclude_row]
+        return bisect.bisect_right(keys, _sort_key(name))
+
+    def _sort_if_unsorted(self, parent: QStandardItem):
+        """Sorts parent's children by casefolded name, if they are out of order.
+
+        The in-order check is one linear pass over the cached sort keys and skips the
+        sort entirely when nothing moved. The sort itself is still Qt's sortChildren()
+        (each comparison calls NotebookItem.data), kept because it is a layout change
+        that preserves expansion and selection.
+        """
+        count = parent.rowCount()
+        keys = [parent.child(r).data(SORT_KEY_ROLE) for r in range(count)]
+        if all(keys[i] <= keys[i + 1] for i in range(count - 1)): return
+        parent.sortChildren(0, Qt.SortOrder.AscendingOrder)
 
+    def _sorted_insert(self, parent: QStandardItem, item: QStandardItem):
+        """Inserts item at its sorted position instead of appending and re-sorting."""
+        parent.insertRow(self._sorted_row(parent, item.text()), item)
+
+
+    def _child_names(self, parent: QStandardItem) -> set[str]:
+        """Returns the cached set of child names of parent, building it on first use."""
+        is_root = parent == self.model.invisibleRootItem()
+        names = self._root_child_names if is_root else getattr(parent, "_children_names", None)
+        if names is None:
+            names = {parent.child(r).text() for r in range(parent.rowCount()) if parent.child(r)}
+            if is_root: self._root_child_names = names
+            elif isinstance(parent, NotebookItem): parent._children_names = names
+        return names
+
+    def _invalidate_child_names(self, parent: QStandardItem | None):
+        """Drops the cached child names of parent (rebuilt lazily on next use)."""
+        if parent is None or parent == self.model.invisibleRootItem():
+            self._root_child_names = None
+        elif isinstance(parent, NotebookItem):
+            parent._children_names = None
+
+    def _add_child(self, parent: QStandardItem, item: QStandardItem):
+        """Inserts a new child (sorted, or deferred during bulk_update) and updates caches."""
+        if self._bulk_depth: # Sorted once when the bulk update ends
+            parent.appendRow(item); self._mark_dirty(parent)
+        else:
+            self._sorted_insert(parent, item) # Keep sorted
+        self._index_item(item)
+        self._child_names(parent).add(item.text())
 
     def _find_unique_name(self, parent_item, base_name):
          """Generates a unique name within the parent item."""
-         current_names = {parent_item.child(r).text() for r in range(parent_item.rowCount()) if parent_item.child(r)}
-         name = base_name
+         current_names = self._child_names(parent_item)
+         if base_name not in current_names: return base_name # Common case: single lookup
          count = 1
+         name = f"{base_name} ({count})"
          while name in current_names:
-             name = f"{base_name} ({count})"
              count += 1
+             name = f"{base_name} ({count})"
          return name
 
     def create_new_notebook(self, parent_item=None, name="New Notebook", item_id=None):
         """Creates a new notebook item."""
         parent = parent_item or self.model.invisibleRootItem()
         # Ensure parent is actually a notebook or the root
-        if parent != self.model.invisibleRootItem() and parent.data(ITEM_TYPE_ROLE) != "notebook":
+        if parent != self.model.invisibleRootItem() and not getattr(parent, "is_notebook", False):
              print("Warning: Attempting to create notebook under a note. Creating under parent notebook instead.")
              parent = parent.parent() or self.model.invisibleRootItem()
 
         actual_name = self._find_unique_name(parent, name)
         nb_item = NotebookItem(actual_name, "notebook", item_id=item_id) # Use provided or generate new ID
 
-        parent.appendRow(nb_item)
-        parent.sortChildren(0, Qt.SortOrder.AscendingOrder) # Keep sorted
+        self._add_child(parent, nb_item)
         idx = nb_item.index()
 
         # Expand parent if it wasn't the root
@@ -470,7 +861,7 @@ class NotebookTree(QTreeView):
         self.setCurrentIndex(idx)
         # QTimer.singleShot(50, lambda i=idx: self.edit(i)) # REMOVED: Don't auto-edit
 
-        self.structureChanged.emit()
+        if not self._bulk_depth: self._struct_timer.start()
         print(f"Created Notebook: {actual_name} (ID: {nb_item.data(ITEM_ID_ROLE)})")
         return nb_item
 
@@ -479,7 +870,7 @@ class NotebookTree(QTreeView):
         if parent_item is None:
              parent_item = self.model.invisibleRootItem()
         # Ensure parent is a notebook or the root
-        elif parent_item.data(ITEM_TYPE_ROLE) != "notebook":
+        elif not getattr(parent_item, "is_notebook", False):
              parent_item = parent_item.parent() or self.model.invisibleRootItem()
 
         actual_name = self._find_unique_name(parent_item, name)
@@ -487,8 +878,7 @@ class NotebookTree(QTreeView):
         note_item = NotebookItem(actual_name, "note", file_path=None)
         new_id = note_item.data(ITEM_ID_ROLE) # Get the generated ID
 
-        parent_item.appendRow(note_item)
-        parent_item.sortChildren(0, Qt.SortOrder.AscendingOrder)
+        self._add_child(parent_item, note_item)
         idx = note_item.index()
 
         # Expand parent if it wasn't the root
@@ -501,7 +891,7 @@ class NotebookTree(QTreeView):
 
         # Emit signal *after* item is added
         self.noteCreated.emit(new_id)
-        self.structureChanged.emit()
+        if not self._bulk_depth: self._struct_timer.start()
         print(f"Created Note Item: {actual_name} (ID: {new_id})")
         return note_item
 
@@ -512,7 +902,7 @@ class NotebookTree(QTreeView):
         if idx.isValid():
             item = self.model.itemFromIndex(idx)
             if isinstance(item, NotebookItem):
-                if item.data(ITEM_TYPE_ROLE) == "notebook":
+                if item.is_notebook:
                      parent_item = item # Create inside selected notebook
                 elif item.parent(): # Create alongside selected note (in its parent notebook)
                      parent_item = item.parent()
@@ -522,7 +912,7 @@ class NotebookTree(QTreeView):
     def update_note_metadata(self, item_id: str, file_path: str = None, gdrive_id: str = None, name: str = None):
         """Updates metadata for a note item found by ID."""
         item = self.find_item_by_id(item_id)
-        if item and item.data(ITEM_TYPE_ROLE) == "note":
+        if item and item.is_note:
             updated = False
             if file_path is not None and item.data(NOTE_FILE_PATH_ROLE) != file_path:
                 item.setData(file_path, NOTE_FILE_PATH_ROLE)
@@ -538,7 +928,8 @@ class NotebookTree(QTreeView):
                 # Re-sort parent if name changed
                 if name is not None:
                     parent = item.parent() or self.model.invisibleRootItem()
-                    parent.sortChildren(0, Qt.SortOrder.AscendingOrder)
+                    if self._bulk_depth: self._mark_dirty(parent)
+                    else: self._sort_if_unsorted(parent)
                 # Optionally emit a signal indicating metadata change?
                 # self.metadataChanged.emit(item_id)
         elif not item:
@@ -556,14 +947,13 @@ class NotebookTree(QTreeView):
          else:
              # Item doesn't exist, create a new one
              # Ensure parent is valid
-             if parent_item is None or (parent_item != self.model.invisibleRootItem() and parent_item.data(ITEM_TYPE_ROLE) != 'notebook'):
+             if parent_item is None or (parent_item != self.model.invisibleRootItem() and not getattr(parent_item, "is_notebook", False)):
                  parent_item = self.model.invisibleRootItem()
 
              actual_name = self._find_unique_name(parent_item, name)
              new_item = NotebookItem(actual_name, "note", file_path, item_id, gdrive_id)
-             parent_item.appendRow(new_item)
-             parent_item.sortChildren(0, Qt.SortOrder.AscendingOrder)
-             self.structureChanged.emit()
+             self._add_child(parent_item, new_item)
+             if not self._bulk_depth: self._struct_timer.start()
              print(f"Created note item via create_or_update: {actual_name} (ID: {item_id})")
              return new_item
 
@@ -588,44 +978,11 @@ class NotebookTree(QTreeView):
         if not item_id: return QMimeData() # Should not happen
 
         mime_data = QMimeData()
-        encoded_data = QByteArray()
-        stream = QDataStream(encoded_data, QIODevice.OpenModeFlag.WriteOnly)
-        stream.writeQString(item_id) # Encode the unique ID
-        mime_data.setData(NOTEBOOK_ITEM_MIME_TYPE, encoded_data)
+        # Raw UTF-8 bytes (ids from older files need not be ASCII UUIDs); no QDataStream per drag
+        mime_data.setData(NOTEBOOK_ITEM_MIME_TYPE, QByteArray(item_id.encode('utf-8')))
         # print(f"Dragging item ID: {item_id}") # Debug
         return mime_data
 
-    def canDropMimeData(self, data: QMimeData, action: Qt.DropAction, row: int, col: int, parent: QModelIndex) -> bool:
-        """Checks if the dragged data can be dropped at the target location."""
-        if not data.hasFormat(NOTEBOOK_ITEM_MIME_TYPE):
-            return False # Only accept our internal type
-
-        # Determine the target item (notebook or root)
-        target_item = self.model.itemFromIndex(parent) if parent.isValid() else self.model.invisibleRootItem()
-
-        # Allow dropping only onto notebooks or the root item's area
-        if not target_item or (parent.isValid() and target_item.data(ITEM_TYPE_ROLE) != 'notebook'):
-            return False
-
-        # Decode the source item ID
-        encoded_data = data.data(NOTEBOOK_ITEM_MIME_TYPE)
-        stream = QDataStream(encoded_data, QIODevice.OpenModeFlag.ReadOnly)
-        if stream.atEnd(): return False
-        source_item_id = stream.readQString()
-        source_item = self.find_item_by_id(source_item_id)
-
-        if not source_item: return False # Source item not found?
-
-        # Prevent dropping an item onto itself or one of its own children
-        temp_parent = target_item
-        while temp_parent != self.model.invisibleRootItem() and temp_parent is not None:
-            if temp_parent == source_item:
-                return False # Cannot drop onto self or descendant
-            temp_parent = temp_parent.parent()
-
-        # Allow dropping 'on' a notebook (becomes last child) or 'between' items
-        return True
-
     def supportedDropActions(self) -> Qt.DropAction:
         """Specifies that only Move actions are supported."""
         return Qt.DropAction.MoveAction
@@ -636,11 +993,9 @@ class NotebookTree(QTreeView):
             event.ignore(); return
 
         # Decode source item ID
-        encoded_data = event.mimeData().data(NOTEBOOK_ITEM_MIME_TYPE)
-        stream = QDataStream(encoded_data, QIODevice.OpenModeFlag.ReadOnly)
-        if stream.atEnd(): event.ignore(); return
-        source_item_id = stream.readQString()
-        source_item = self.find_item_by_id(source_item_id)
+        source_item_id = _drag_item_id(event.mimeData())
+        if not source_item_id: event.ignore(); return
+        source_item = self._lookup(self._by_id, source_item_id) # Index only: no tree walk per drag move
 
         if not source_item: event.ignore(); return
 
@@ -648,7 +1003,7 @@ class NotebookTree(QTreeView):
         source_parent = source_item.parent() or self.model.invisibleRootItem()
         source_row = source_item.row()
 
-        # Determine target parent and row based on drop position
+        # Determine target parent and row based on drop position (single hit-test per drop)
         drop_pos = event.position().toPoint()
         target_idx = self.indexAt(drop_pos)
         target_item = self.model.itemFromIndex(target_idx) if target_idx.isValid() else None
@@ -656,11 +1011,11 @@ class NotebookTree(QTreeView):
         target_parent = None
         target_row = -1
 
-        drop_indicator = self.dropIndicatorPosition()
+        drop_indicator = self.dropIndicatorPosition() # Stored by the last dragMoveEvent; no hit-test
 
         if drop_indicator == QAbstractItemView.DropIndicatorPosition.OnItem:
             # Dropped directly onto a notebook item
-            if target_item and target_item.data(ITEM_TYPE_ROLE) == 'notebook':
+            if target_item and getattr(target_item, "is_notebook", False):
                 target_parent = target_item
                 target_row = target_parent.rowCount() # Append to end
             else: event.ignore(); return # Ignore drop onto notes
@@ -679,9 +1034,20 @@ class NotebookTree(QTreeView):
 
         if target_parent is None: event.ignore(); return
 
+        # Prevent dropping an item onto itself or one of its own children (one walk per drop)
+        temp_parent = target_parent
+        while temp_parent is not None and temp_parent != self.model.invisibleRootItem():
+            if temp_parent == source_item: event.ignore(); return
+            temp_parent = temp_parent.parent()
+
         # --- Perform the move ---
         # Check if move is within the same parent (just reordering)
         is_reorder = (source_parent == target_parent)
+        if is_reorder:
+            # Siblings are kept sorted by name, so a same-parent drop would land on the
+            # row it came from: skip the take/insert round-trip entirely. Nothing moved,
+            # so report IgnoreAction rather than letting the view treat it as a move.
+            event.setDropAction(Qt.DropAction.IgnoreAction); event.accept(); return
 
         # Take the row from the source parent (returns a list containing the item)
         # Note: takeRow modifies the source parent immediately
@@ -692,50 +1058,51 @@ class NotebookTree(QTreeView):
             return
 
         moved_item = moved_item_list[0]
+        self._invalidate_child_names(source_parent) # A same-named sibling may remain; rebuild lazily
+        self._child_names(target_parent).add(moved_item.text())
 
-        # Adjust target row if moving downwards within the same parent
-        if is_reorder and source_row < target_row:
-            target_row -= 1
-
-        # Insert the item at the target location
-        target_parent.insertRow(target_row, moved_item)
+        # Siblings are kept sorted, so the item goes to its sorted row regardless of the
+        # indicator position; removing it left the source parent sorted as well.
+        self._sorted_insert(target_parent, moved_item)
 
         # Ensure parent is expanded and item is selected
         if target_parent != self.model.invisibleRootItem():
              self.expand(target_parent.index())
         self.setCurrentIndex(moved_item.index()) # Select the moved item
 
-        target_parent.sortChildren(0, Qt.SortOrder.AscendingOrder) # Keep target sorted
-        if source_parent != target_parent:
-            source_parent.sortChildren(0, Qt.SortOrder.AscendingOrder) # Keep source sorted too
-
         event.acceptProposedAction()
-        self.structureChanged.emit() # Signal that structure has changed
-        print(f"Moved item '{moved_item.text()}' to '{target_parent.text()}' at row {target_row}")
+        self._struct_timer.start() # Signal that structure has changed
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Moved item '%s' to '%s' at row %d", moved_item.text(), target_parent.text(), moved_item.row())
 
 
     # --- Persistence ---
 
     def get_notebook_structure(self, parent_item=None) -> list:
-        """Recursively gets the structure of the notebook tree."""
+        """Gets the structure of the notebook tree (iterative walk, no recursion).
+
+        "children" is omitted for leaf items; loading treats a missing key as empty.
+        """
         if parent_item is None:
             parent_item = self.model.invisibleRootItem()
 
         structure = []
-        for row in range(parent_item.rowCount()):
-            item = parent_item.child(row)
-            if isinstance(item, NotebookItem):
+        stack = [(parent_item, structure)] # (parent, list receiving its children's dicts)
+        while stack:
+            parent, out = stack.pop()
+            for row in range(parent.rowCount()):
+                item = parent.child(row) # Every row in this model is a NotebookItem
                 item_data = {
-                    "id": item.data(ITEM_ID_ROLE),
+                    "id": item._item_id,
                     "name": item.text(),
-                    "type": item.data(ITEM_TYPE_ROLE),
-                    "path": item.data(NOTE_FILE_PATH_ROLE), # Store path for notes
-                    "gdrive_id": item.data(GDRIVE_ID_ROLE), # Store GDrive ID
-                    "children": []
+                    "type": item._item_type, # Interned
+                    "path": item._file_path, # Store path for notes
+                    "gdrive_id": item._gdrive_id, # Store GDrive ID
                 }
-                if item.hasChildren():
-                    item_data["children"] = self.get_notebook_structure(item)
-                structure.append(item_data)
+                if item.rowCount():
+                    item_data["children"] = children = []
+                    stack.append((item, children))
+                out.append(item_data)
         return structure
 
     def load_notebook_structure(self):
@@ -747,18 +1114,37 @@ class NotebookTree(QTreeView):
             return
 
         try:
-            with open(fpath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Startup: the binary cache skips JSON parsing when it is at least as new as the JSON
+            top_items = self._read_structure_cache(fpath)
+            if top_items is None:
+                with open(fpath, 'rb') as f:
+                    raw = f.read()
+                data = _decode_structure_file(raw)
             self.model.clear() # Clear existing model before loading
+            self._clear_indexes()
             self.model.setHorizontalHeaderLabels(['Notebooks']) # Set header label (optional)
-            self._populate_from_structure(self.model.invisibleRootItem(), data)
-            print(f"Notebook structure loaded from: {fpath}")
-            # Expand top-level items by default after loading
-            self.expandAll() # Expand all items to ensure visibility
-            self.viewport().update() # Force viewport update
-            self.doItemsLayout() # Force layout recalculation
-
-        except (json.JSONDecodeError, IOError) as e:
+            if top_items is None: top_items = self._build_items(data) # Cache is written from the sorted tree
+            # The whole tree is built detached, so attaching it is one rowsInserted for the view
+            self.model.invisibleRootItem().appendRows(top_items)
+            self._index_item(self.model.invisibleRootItem())
+            self._save_blocked = False
+            logger.debug("Notebook structure loaded from: %s", fpath)
+            # Expand all items to ensure visibility. expandRecursively() defers the layout
+            # until the whole branch is expanded; one repaint once done.
+            self.setUpdatesEnabled(False)
+            try:
+                for r in range(self.model.rowCount()):
+                    self.expandRecursively(self.model.index(r, 0))
+            finally: self.setUpdatesEnabled(True)
+
+        except StructureCodecUnavailable as e:
+            # The file is fine, we just can't read it here: leave it alone and never save over it
+            print(f"Error loading notebook structure from {fpath}: {e}")
+            self._save_blocked = True
+            QMessageBox.warning(self, "Notebooks Not Loaded",
+                                f"The notebook structure file is compressed with zstd, but the 'zstandard' package is not installed.\n\n"
+                                f"Install it (pip install zstandard) and restart. The file was left untouched and will not be overwritten:\n{fpath}")
+        except (ValueError, IOError) as e: # JSON decode errors (stdlib/orjson) and zstd failures are ValueErrors
             print(f"Error loading notebook structure from {fpath}: {e}")
             # Backup corrupted file
             backup_path = fpath + f".backup.{int(time.time())}"
@@ -767,45 +1153,127 @@ class NotebookTree(QTreeView):
                  print(f"Backed up corrupted structure file to: {backup_path}")
             except OSError: pass
             self.model.clear() # Start fresh if load fails
+            self._clear_indexes()
             self.model.setHorizontalHeaderLabels(['Notebooks']) # Set header label
         except Exception as e:
              print(f"Unexpected error loading structure: {e}")
              import traceback; traceback.print_exc()
              self.model.clear()
+             self._clear_indexes()
              self.model.setHorizontalHeaderLabels(['Notebooks']) # Set header label
 
-    def _populate_from_structure(self, parent, data_list):
-        """Recursively populates the model from the loaded data structure."""
-        for data in data_list:
-             # Create item using stored data
-             item = NotebookItem(
-                 text=data.get("name", "?"),
-                 item_type=data.get("type", "note"),
-                 file_path=data.get("path"),
-                 item_id=data.get("id"), # Use stored ID
-                 gdrive_id=data.get("gdrive_id")
-             )
-             parent.appendRow(item)
-             # Recursively populate children
+    def _read_structure_cache(self, fpath: str) -> list | None:
+        """Builds detached top-level items from the binary cache, or None if it is stale/invalid."""
+        cpath = fpath + STRUCTURE_CACHE_SUFFIX
+        try:
+            if os.path.getmtime(cpath) < os.path.getmtime(fpath): return None # JSON edited since
+            json_size = os.path.getsize(fpath); cache_size = os.path.getsize(cpath)
+        except OSError: return None
+        f = QFile(cpath)
+        if not f.open(QIODevice.OpenModeFlag.ReadOnly): return None
+        try:
+            stream = QDataStream(f)
+            stream.setVersion(QDataStream.Version.Qt_6_0)
+            if stream.readUInt32() != _CACHE_MAGIC or stream.readUInt16() != _CACHE_VERSION: return None
+            if stream.readUInt64() != json_size: return None # JSON replaced by something else
+            count = stream.readUInt32()
+            # The header is untrusted: a count the file cannot hold means truncation/corruption
+            if count * _CACHE_MIN_NODE_SIZE > cache_size - _CACHE_HEADER_SIZE: return None
+            top_items = []
+            stack = [] # [item, children still to read]
+            for remaining in range(count - 1, -1, -1):
+                while stack and stack[-1][1] == 0: stack.pop()
+                tag = stream.readUInt8()
+                name, item_id, path, gid = (stream.readQString() for _ in range(4))
+                n_children = stream.readUInt32()
+                if stream.status() != QDataStream.Status.Ok or n_children > remaining: return None # Truncated/corrupt; use JSON
+                item = NotebookItem(text=name, item_type="notebook" if tag == 1 else "note",
+                                    file_path=path or None, item_id=item_id or None, gdrive_id=gid or None)
+                if stack:
+                    stack[-1][0].appendRow(item); stack[-1][1] -= 1
+                else:
+                    top_items.append(item)
+                if n_children: stack.append([item, n_children])
+            if any(pending for _, pending in stack): return None # Children promised but missing
+            logger.debug("Notebook structure loaded from cache: %s", cpath)
+            return top_items
+        finally:
+            f.close()
+
+    def _build_items(self, data_list) -> list:
+        """Recursively builds detached, sorted items from the loaded data structure."""
+        # Sort the plain dicts up front so each level is appended already in order
+        level = sorted(data_list, key=lambda d: _sort_key(d.get("name", "?")))
+        # Create items using stored data
+        siblings = [NotebookItem(
+                        text=data.get("name", "?"),
+                        item_type=data.get("type", "note"),
+                        file_path=data.get("path"),
+                        item_id=data.get("id"), # Use stored ID
+                        gdrive_id=data.get("gdrive_id")
+                    ) for data in level]
+        # Recursively build children (appending to a detached item emits no model signals)
+        for data, item in zip(level, siblings):
              if data.get("children"):
-                 self._populate_from_structure(item, data["children"])
-        # Sort children after populating a level
-        parent.sortChildren(0, Qt.SortOrder.AscendingOrder)
+                 item.appendRows(self._build_items(data["children"])) # One insertion per level
+        return siblings
 
 
     def save_notebook_structure(self):
-        """Saves the current notebook structure to the JSON file."""
-        data = self.get_notebook_structure()
+        """Saves the current notebook structure to the JSON file (and its binary cache).
+
+        Both are encoded here on the GUI thread, straight from the model; the disk
+        writes run on the single-threaded save pool, so saves land in order.
+        """
         fpath = settings_manager.get("notebook_data_file")
-        tpath = fpath + ".tmp" # Save to temp file first
+        if self._save_blocked:
+            print(f"Not saving notebook structure: {fpath} was not loaded and would be overwritten.")
+            return
+        json_bytes, cache_bytes = self._encode_structure()
+        self._save_pool.start(SaveStructureRunnable(json_bytes, cache_bytes, fpath))
+
+    def _encode_structure(self) -> tuple[bytes, bytes]:
+        """Serializes the tree in one pre-order walk, without a nested dict mirror.
+
+        Returns the JSON document (same layout as get_notebook_structure(), compact)
+        and the binary cache: a flat QDataStream of nodes with their child counts.
+        """
+        chunks = []; w = chunks.append
+        buf = QBuffer(); buf.open(QIODevice.OpenModeFlag.WriteOnly)
+        stream = QDataStream(buf)
+        stream.setVersion(QDataStream.Version.Qt_6_0)
+        stream.writeUInt32(_CACHE_MAGIC); stream.writeUInt16(_CACHE_VERSION)
+        stream.writeUInt64(0) # JSON size, patched by SaveStructureRunnable once the file is encoded
+        stream.writeUInt32(0) # Count patched below
 
-        try:
-            os.makedirs(os.path.dirname(fpath), exist_ok=True) # Ensure directory exists
-            with open(tpath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2) # Pretty print JSON
-            os.replace(tpath, fpath) # Atomic replace if possible
-            # print(f"Notebook structure saved: {fpath}") # Reduce noise, only log on change?
-        except Exception as e:
-            print(f"Error saving notebook structure to {fpath}: {e}")
-            # Optionally show error to user
-            # QMessageBox.warning(self, "Save Error", f"Could not save notebook structure:\n{e}")
+        root = self.model.invisibleRootItem()
+        stack = [root.child(r) for r in reversed(range(root.rowCount()))] # None closes a children list
+        count = 0; first = True
+        w(b'[')
+        while stack:
+            item = stack.pop()
+            if item is None:
+                w(b']}'); first = False; continue
+            if not first: w(b',')
+            name = item.text(); n = item.rowCount()
+            w(b'{"id":'); w(_json_value(item._item_id))
+            w(b',"name":'); w(_json_value(name))
+            w(b',"type":'); w(_json_value(item._item_type))
+            w(b',"path":'); w(_json_value(item._file_path))
+            w(b',"gdrive_id":'); w(_json_value(item._gdrive_id))
+            stream.writeUInt8(1 if item.is_notebook else 0)
+            for value in (name, item._item_id, item._file_path, item._gdrive_id):
+                stream.writeQString(value or "")
+            stream.writeUInt32(n)
+            count += 1
+            if n:
+                w(b',"children":['); first = True
+                stack.append(None)
+                stack.extend(item.child(r) for r in reversed(range(n)))
+            else:
+                w(b'}'); first = False
+        w(b']')
+
+        buf.seek(_CACHE_HEADER_SIZE - 4); stream.writeUInt32(count) # Last header field
+        buf.close()
+        return b"".join(chunks), bytes(buf.data())
@@ -2,39 +2,85 @@ import os
 import sys
 import subprocess
 import shutil # For which()
+import functools
+import logging
+import types
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QGroupBox,
                              QComboBox, QSpinBox, QPushButton, QDialogButtonBox,
                              QLineEdit, QFileDialog, QLabel, QFontComboBox,
-                             QHBoxLayout, QCheckBox, QTabWidget, QWidget, QMessageBox)
-from PyQt6.QtGui import QFont, QIntValidator, QPalette, QAction, QColor
+                             QHBoxLayout, QCheckBox, QTabWidget, QWidget, QMessageBox,
+                             QApplication)
+from PyQt6.QtGui import QFont, QIntValidator, QPalette, QAction, QColor, QPixmap, QPainter
 from PyQt6.QtCore import Qt, QDir, QStandardPaths, QSize
 from PyQt6.QtMultimedia import QMediaDevices # For audio device listing
 
 from core.settings import settings_manager, APP_NAME, ORG_NAME
-from ui.toolbar import load_icon # For consistent icons
+from ui.icon_cache import get_icon # For consistent icons
 
 # Import availability flags (or check dynamically)
 from core.llm import LLAMA_CPP_AVAILABLE
 from core.transcription import WHISPER_AVAILABLE
 from core.spellcheck import LANGUAGETOOL_AVAILABLE, HUNSPELL_AVAILABLE, ASPELL_AVAILABLE
 
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=8)
+def _binary_available(name: str) -> bool:
+    """Whether an executable is on PATH; the PATH walk happens once per process."""
+    return shutil.which(name) is not None
+
+@functools.cache
+def _home_path() -> str:
+    """Fallback directory for the browse dialogs, resolved once per process."""
+    return QDir.homePath()
+
+# Status dot colors; the pixmaps are painted on first use (they need a QGuiApplication)
+_STATUS_COLORS = {"ok": "green", "warn": "orange", "off": "gray"}
+
+@functools.lru_cache(maxsize=None)
+def _status_pixmap(kind: str) -> QPixmap:
+    """12x12 filled dot for a status kind, painted once per process."""
+    pix = QPixmap(12, 12); pix.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pix); painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen); painter.setBrush(QColor(_STATUS_COLORS[kind])); painter.drawEllipse(1, 1, 10, 10); painter.end()
+    return pix
+
+
 class SettingsDialog(QDialog):
+    # Audio devices enumerated once per process: {is_input: (devices, default device)}
+    _audio_cache = {}
+    _media_devices = None # Process-wide QMediaDevices; its change signals drop the stale cache entry
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.setProperty("darkMode", settings_manager.is_dark_mode()) # Before any children exist, so nothing is re-polished
+        self.setStyleSheet('QLineEdit#PathDisplay[readOnly="true"] { background-color: palette(window); border: 1px solid palette(mid); color: palette(mid); }') # Parsed once for all path displays
         self.setWindowTitle(f"{APP_NAME} Settings")
         self.setMinimumWidth(600)
-        self.setProperty("darkMode", settings_manager.is_dark_mode())
-        self._initial_settings = {} # Store initial values to track changes
+        self._initial_settings = types.MappingProxyType({}) # Read-only view of initial values; replaced, never mutated
+        self._dirty_keys = set() # Keys whose field differs from _initial_settings
+        self._n_dirty = 0 # len(_dirty_keys), kept incrementally for the Apply button
+        self._loading = False # Set while a tab loader fills its widgets; _mark_dirty ignores those changes
+        self._settings = settings_manager.snapshot() # Read once; every lazily built tab loads from it
 
         self.tab_widget = QTabWidget(self)
         layout = QVBoxLayout(self); layout.addWidget(self.tab_widget)
 
-        self.create_appearance_tab()
-        self.create_editor_tab()
-        self.create_files_tab()
-        self.create_audio_tab()
-        self.create_ai_tab()
-        self.create_cloud_tab()
+        # Tabs start as empty placeholders and are built on first activation (audio device
+        # enumeration and engine probing only happen if their tab is opened)
+        tabs = [ # (builder, loader, fields, icon, fallback icon, title)
+            (self.create_appearance_tab, self._load_appearance, self._appearance_fields, "preferences-desktop-theme", None, "Appearance"),
+            (self.create_editor_tab, self._load_editor, self._editor_fields, "preferences-desktop-font", None, "Editor"),
+            (self.create_files_tab, self._load_files, self._files_fields, "folder-saved-search", None, "Files & Session"),
+            (self.create_audio_tab, self._load_audio, self._audio_fields, "audio-card", None, "Audio Devices"),
+            (self.create_ai_tab, self._load_ai, self._ai_fields, "applications-science", None, "AI Tools"),
+            (self.create_cloud_tab, self._load_cloud, self._cloud_fields, "cloud", "network-server", "Cloud Sync"),
+        ]
+        self._pending_tabs = {} # index -> (builder, loader, fields) not built yet
+        self._built_tabs = [] # (tab widget, loader, fields) of built tabs
+        for idx, (build, load, fields, icon, fallback, title) in enumerate(tabs):
+            self.tab_widget.addTab(QWidget(), get_icon(icon, fallback), title)
+            self._pending_tabs[idx] = (build, load, fields)
 
         self.button_box = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel | QDialogButtonBox.StandardButton.Apply)
@@ -44,74 +90,80 @@ class SettingsDialog(QDialog):
         self.apply_button.clicked.connect(self.apply_settings)
         layout.addWidget(self.button_box)
 
-        self.load_settings()
-        self._store_initial_settings() # Store after loading
         self.apply_button.setEnabled(False) # Initially disabled
-
-        # Connect signals from input widgets to detect changes
-        self._connect_change_signals()
+        self._ensure_tab_built(self.tab_widget.currentIndex()) # Loads, stores initial values, connects signals
+        self.tab_widget.currentChanged.connect(self._ensure_tab_built)
+
+    def _ensure_tab_built(self, index):
+        """Builds and loads the tab at index the first time it is shown."""
+        pending = self._pending_tabs.pop(index, None)
+        if pending is None: return
+        build, load, fields = pending
+        tab = self.tab_widget.widget(index)
+        build(tab); self._load_tab(tab, load, self._settings)
+        self._built_tabs.append((tab, load, fields))
+        # Store initial values after loading, then connect signals to detect changes
+        initial = dict(self._initial_settings)
+        for key, signal, getter in fields():
+            initial[key] = getter()
+            signal.connect(lambda *_, k=key, g=getter: self._mark_dirty(k, g()))
+        self._initial_settings = types.MappingProxyType(initial)
 
 
     def _store_initial_settings(self):
         """Stores the current values of all settings fields."""
-        self._initial_settings = self._get_current_field_values()
+        self._initial_settings = types.MappingProxyType(self._get_current_field_values())
+        self._dirty_keys = set() # Keys whose field differs from _initial_settings
+        self._n_dirty = 0
+
+    # (key, change signal, value getter) for every settings input widget, per tab
+    def _appearance_fields(self):
+        return [("use_system_theme", self.system_theme_check.toggled, self.system_theme_check.isChecked),
+                ("theme", self.theme_combo.currentTextChanged, self.theme_combo.currentText)]
+
+    def _editor_fields(self):
+        return [("font_family", self.font_combo.currentFontChanged, lambda: self.font_combo.currentFont().family()),
+                ("font_size", self.font_size_spin.valueChanged, self.font_size_spin.value),
+                ("language", self.language_edit.textChanged, self.language_edit.text)]
+
+    def _files_fields(self):
+        return [("default_save_path", self.default_save_path_edit.textChanged, self.default_save_path_edit.text),
+                ("autosave_interval_sec", self.autosave_spin.valueChanged, self.autosave_spin.value),
+                ("session_restore", self.session_restore_check.stateChanged, self.session_restore_check.isChecked)]
+
+    def _audio_fields(self):
+        return [("audio_input_device", self.audio_input_combo.currentIndexChanged, self.audio_input_combo.currentData),
+                ("audio_output_device", self.audio_output_combo.currentIndexChanged, self.audio_output_combo.currentData)]
+
+    def _ai_fields(self):
+        return [("llm_model_path", self.llm_path_edit.textChanged, self.llm_path_edit.text),
+                ("whisper_model_version", self.whisper_model_combo.currentTextChanged, self.whisper_model_combo.currentText),
+                ("spellcheck_engine", self.spellcheck_combo.currentTextChanged, self.spellcheck_combo.currentText)]
+
+    def _cloud_fields(self):
+        return [("google_client_secret_path", self.gdrive_secret_edit.textChanged, self.gdrive_secret_edit.text)]
+
+    def _fields(self):
+        """Fields of the tabs built so far (unbuilt tabs cannot have changes)."""
+        return [field for _, _, fields in self._built_tabs for field in fields()]
 
     def _get_current_field_values(self):
         """Reads the current values from all UI fields."""
-        # This needs to collect values from ALL input widgets across tabs
-        return {
-            "use_system_theme": self.system_theme_check.isChecked(),
-            "theme": self.theme_combo.currentText(),
-            "font_family": self.font_combo.currentFont().family(),
-            "font_size": self.font_size_spin.value(),
-            "language": self.language_edit.text(),
-            "default_save_path": self.default_save_path_edit.text(),
-            "autosave_interval_sec": self.autosave_spin.value(),
-            "session_restore": self.session_restore_check.isChecked(),
-            "audio_input_device": self.audio_input_combo.currentData(),
-            "audio_output_device": self.audio_output_combo.currentData(),
-            "llm_model_path": self.llm_path_edit.text(),
-            "whisper_model_version": self.whisper_model_combo.currentText(),
-            "spellcheck_engine": self.spellcheck_combo.currentText(),
-            "google_client_secret_path": self.gdrive_secret_edit.text(),
-        }
-
-    def _connect_change_signals(self):
-        """Connect signals from widgets to the _on_setting_changed slot."""
-        # Appearance
-        self.system_theme_check.toggled.connect(self._on_setting_changed)
-        self.theme_combo.currentTextChanged.connect(self._on_setting_changed)
-        # Editor
-        self.font_combo.currentFontChanged.connect(self._on_setting_changed)
-        self.font_size_spin.valueChanged.connect(self._on_setting_changed)
-        self.language_edit.textChanged.connect(self._on_setting_changed)
-        # Files & Session
-        self.default_save_path_edit.textChanged.connect(self._on_setting_changed)
-        self.autosave_spin.valueChanged.connect(self._on_setting_changed)
-        self.session_restore_check.stateChanged.connect(self._on_setting_changed)
-        # Audio
-        self.audio_input_combo.currentIndexChanged.connect(self._on_setting_changed)
-        self.audio_output_combo.currentIndexChanged.connect(self._on_setting_changed)
-        # AI
-        self.llm_path_edit.textChanged.connect(self._on_setting_changed)
-        self.whisper_model_combo.currentTextChanged.connect(self._on_setting_changed)
-        self.spellcheck_combo.currentTextChanged.connect(self._on_setting_changed)
-        # Cloud
-        self.gdrive_secret_edit.textChanged.connect(self._on_setting_changed)
-
-    def _on_setting_changed(self):
-        """Called when any setting widget's value changes. Enables Apply button."""
-        # Compare current field values with initial values
-        current_values = self._get_current_field_values()
-        if current_values != self._initial_settings:
-            self.apply_button.setEnabled(True)
-        else:
-            self.apply_button.setEnabled(False)
-
-
-    def create_appearance_tab(self):
-        tab = QWidget(); layout = QFormLayout(tab); layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapLongRows)
-        self.tab_widget.addTab(tab, load_icon("preferences-desktop-theme"), "Appearance")
+        return {key: getter() for key, _, getter in self._fields()}
+
+    def _mark_dirty(self, key, value):
+        """Called when one setting widget's value changes. Only that field is re-read."""
+        if self._loading: return # Loader filling the field, not a user edit
+        was_dirty = key in self._dirty_keys
+        is_dirty = value != self._initial_settings.get(key)
+        if is_dirty == was_dirty: return # No transition, Apply state unchanged
+        if is_dirty: self._dirty_keys.add(key); self._n_dirty += 1
+        else: self._dirty_keys.remove(key); self._n_dirty -= 1
+        self.apply_button.setEnabled(self._n_dirty > 0)
+
+
+    def create_appearance_tab(self, tab: QWidget):
+        layout = QFormLayout(tab); layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapLongRows)
 
         self.system_theme_check = QCheckBox("Use System Theme (Experimental)")
         self.system_theme_check.setToolTip(
@@ -127,8 +179,8 @@ class SettingsDialog(QDialog):
         self.system_theme_check.toggled.connect(self.theme_combo.setDisabled)
 
 
-    def create_editor_tab(self):
-        tab = QWidget(); layout = QVBoxLayout(tab); self.tab_widget.addTab(tab, load_icon("preferences-desktop-font"), "Editor")
+    def create_editor_tab(self, tab: QWidget):
+        layout = QVBoxLayout(tab)
         font_group = QGroupBox("Font"); font_form = QFormLayout(font_group); font_form.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapLongRows)
         font_layout = QHBoxLayout(); self.font_combo = QFontComboBox(); self.font_combo.setToolTip("Editor font family.")
         self.font_size_spin = QSpinBox(); self.font_size_spin.setRange(6, 72); self.font_size_spin.setSuffix(" pt"); self.font_size_spin.setToolTip("Editor font size.")
@@ -137,32 +189,29 @@ class SettingsDialog(QDialog):
         self.language_edit = QLineEdit(); self.language_edit.setPlaceholderText("e.g., en-US, de-DE"); self.language_edit.setToolTip("Language code (BCP 47) for spell check.")
         spell_form.addRow("Spell Check Language:", self.language_edit); layout.addWidget(spell_group); layout.addStretch(1)
 
-    def create_files_tab(self):
-        tab = QWidget(); layout = QVBoxLayout(tab); self.tab_widget.addTab(tab, load_icon("folder-saved-search"), "Files & Session")
+    def create_files_tab(self, tab: QWidget):
+        layout = QVBoxLayout(tab)
         paths_group = QGroupBox("Local Storage"); paths_form = QFormLayout(paths_group); paths_form.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapLongRows)
-        self.default_save_path_edit = QLineEdit(); self.default_save_path_edit.setToolTip("Default directory for saving new notes.")
-        self.default_save_path_button = QPushButton(); self.default_save_path_button.setIcon(load_icon("folder-open")); self.default_save_path_button.setToolTip("Browse..."); self.default_save_path_button.clicked.connect(self._browse_default_save_path)
-        save_path_layout = QHBoxLayout(); save_path_layout.addWidget(self.default_save_path_edit); save_path_layout.addWidget(self.default_save_path_button)
-        paths_form.addRow("Default Save Path:", save_path_layout)
+        self.default_save_path_edit, self.default_save_path_button = self._add_path_row(
+            paths_form, "Default Save Path:", None, "Default directory for saving new notes.", "folder-open", self._browse_default_save_path)
         self.autosave_spin = QSpinBox(); self.autosave_spin.setRange(0, 3600); self.autosave_spin.setSuffix(" seconds"); self.autosave_spin.setSpecialValueText("Disabled"); self.autosave_spin.setToolTip("Autosave interval (0=disabled).")
         paths_form.addRow("Autosave Interval:", self.autosave_spin); layout.addWidget(paths_group)
         session_group = QGroupBox("Session"); session_form = QFormLayout(session_group)
         self.session_restore_check = QCheckBox("Restore last session on startup"); self.session_restore_check.setToolTip("Reopen tabs from previous session.")
         session_form.addRow(self.session_restore_check); layout.addWidget(session_group)
         data_loc_group = QGroupBox("Application Data Locations"); data_loc_form = QFormLayout(data_loc_group); data_loc_form.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapLongRows)
-        self.notebook_path_display=self._create_readonly_path_display(settings_manager.get("notebook_data_file")); data_loc_form.addRow("Notebook Data:",self.notebook_path_display)
-        self.session_path_display=self._create_readonly_path_display(settings_manager.get("last_session_file")); data_loc_form.addRow("Session Data:",self.session_path_display)
-        self.gdrive_map_path_display=self._create_readonly_path_display(settings_manager.get("gdrive_note_map_file")); data_loc_form.addRow("GDrive Map:",self.gdrive_map_path_display)
-        self.gdrive_token_path_display=self._create_readonly_path_display(settings_manager.get("google_credentials_path")); data_loc_form.addRow("GDrive Token:",self.gdrive_token_path_display)
+        self.notebook_path_display=self._create_readonly_path_display(); data_loc_form.addRow("Notebook Data:",self.notebook_path_display)
+        self.session_path_display=self._create_readonly_path_display(); data_loc_form.addRow("Session Data:",self.session_path_display)
+        self.gdrive_map_path_display=self._create_readonly_path_display(); data_loc_form.addRow("GDrive Map:",self.gdrive_map_path_display)
+        self.gdrive_token_path_display=self._create_readonly_path_display(); data_loc_form.addRow("GDrive Token:",self.gdrive_token_path_display)
         layout.addWidget(data_loc_group); layout.addStretch(1)
 
-    def _create_readonly_path_display(self, path):
-        line=QLineEdit(path); line.setReadOnly(True); line.setToolTip(path); line.setStyleSheet("QLineEdit[readOnly=\"true\"] { background-color: palette(window); border: 1px solid palette(mid); color: palette(mid); }")
+    def _create_readonly_path_display(self):
+        line=QLineEdit(); line.setObjectName("PathDisplay"); line.setReadOnly(True) # Styled by the dialog's stylesheet
         return line
 
-    def create_audio_tab(self):
-        tab = QWidget(); layout = QFormLayout(tab); layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapLongRows)
-        self.tab_widget.addTab(tab, load_icon("audio-card"), "Audio Devices")
+    def create_audio_tab(self, tab: QWidget):
+        layout = QFormLayout(tab); layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapLongRows)
         input_group = QGroupBox("Microphone (for Transcription)"); input_form = QFormLayout(input_group)
         self.audio_input_combo = QComboBox(); self.audio_input_combo.setToolTip("Microphone for voice transcription.")
         self.populate_audio_devices(self.audio_input_combo, input_devices=True); input_form.addRow("Input Device:", self.audio_input_combo); layout.addWidget(input_group)
@@ -171,150 +220,185 @@ class SettingsDialog(QDialog):
         self.populate_audio_devices(self.audio_output_combo, input_devices=False); output_form.addRow("Output Device:", self.audio_output_combo); self.audio_output_combo.setEnabled(False)
         output_form.addRow(QLabel("(TTS not implemented)")); layout.addWidget(output_group)
 
+    @classmethod
+    def _get_audio_devices(cls, input_devices: bool):
+        """Returns (devices, default device), re-enumerating only after the OS device list changed."""
+        if cls._media_devices is None:
+            cls._media_devices = QMediaDevices(QApplication.instance()) # Lives as long as the app, like the cache
+            cls._media_devices.audioInputsChanged.connect(lambda: cls._audio_cache.pop(True, None))
+            cls._media_devices.audioOutputsChanged.connect(lambda: cls._audio_cache.pop(False, None))
+        if input_devices not in cls._audio_cache:
+            if input_devices: cls._audio_cache[True] = (QMediaDevices.audioInputs(), QMediaDevices.defaultAudioInput())
+            else: cls._audio_cache[False] = (QMediaDevices.audioOutputs(), QMediaDevices.defaultAudioOutput())
+        return cls._audio_cache[input_devices]
+
     def populate_audio_devices(self, combo_box: QComboBox, input_devices: bool):
         combo_box.clear(); combo_box.addItem("Default Device", "")
-        devices = QMediaDevices.audioInputs() if input_devices else QMediaDevices.audioOutputs()
-        default_device = QMediaDevices.defaultAudioInput() if input_devices else QMediaDevices.defaultAudioOutput()
-        for device in devices:
+        devices, default_device = self._get_audio_devices(input_devices)
+        combo_box._data_index = {"": 0} # Hash lookups instead of findData scans
+        for idx, device in enumerate(devices, 1):
             desc = device.description()
-            if device == default_device: desc += " (Default)"
-            combo_box.addItem(desc, device.description()) # Store description as data
+            combo_box.addItem(desc + (" (Default)" if device == default_device else ""), desc) # Store description as data
+            combo_box._data_index.setdefault(desc, idx) # First match, like findData
+
+    def _audio_device_index(self, combo_box: QComboBox, saved: str) -> int:
+        """Index of the saved device description, else 0 (default)."""
+        return combo_box._data_index.get(saved, 0)
 
-    def create_ai_tab(self):
-        tab = QWidget(); layout = QVBoxLayout(tab); self.tab_widget.addTab(tab, load_icon("applications-science"), "AI Tools")
+    def create_ai_tab(self, tab: QWidget):
+        layout = QVBoxLayout(tab)
         # --- LLM ---
         llm_group=QGroupBox("Local LLM (Text Correction)"); llm_form=QFormLayout(llm_group); llm_form.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapLongRows)
-        llm_h_layout=QHBoxLayout(); llm_status_layout=QHBoxLayout() # Layout for status
-        self.llm_path_edit=QLineEdit(); self.llm_path_edit.setPlaceholderText("Path to .gguf"); self.llm_path_edit.setToolTip("GGUF model for llama.cpp")
-        self.llm_path_button=QPushButton(); self.llm_path_button.setIcon(load_icon("document-open")); self.llm_path_button.setToolTip("Browse..."); self.llm_path_button.clicked.connect(self._browse_llm_path)
-        llm_h_layout.addWidget(self.llm_path_edit); llm_h_layout.addWidget(self.llm_path_button)
-        llm_form.addRow("Model Path:", llm_h_layout)
-        self.llm_status_label = QLabel(); self._update_status_label(self.llm_status_label, LLAMA_CPP_AVAILABLE, "llama-cpp-python library")
-        llm_status_layout.addWidget(QLabel("Status:")); llm_status_layout.addWidget(self.llm_status_label); llm_status_layout.addStretch()
-        llm_form.addRow(llm_status_layout); layout.addWidget(llm_group)
+        self.llm_path_edit, self.llm_path_button = self._add_path_row(
+            llm_form, "Model Path:", "Path to .gguf", "GGUF model for llama.cpp", "document-open", self._browse_llm_path)
+        self.llm_status_label = self._add_status_row(llm_form, LLAMA_CPP_AVAILABLE, "llama-cpp-python library"); layout.addWidget(llm_group)
         # --- Whisper ---
         whisper_group=QGroupBox("Voice Transcription (Whisper)"); whisper_form=QFormLayout(whisper_group); whisper_form.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapLongRows)
-        whisper_status_layout = QHBoxLayout()
         self.whisper_model_combo=QComboBox(); whisper_models=["tiny","base","small","medium","large","tiny.en","base.en","small.en","medium.en"]; self.whisper_model_combo.addItems(whisper_models)
         self.whisper_model_combo.setToolTip("Whisper model size.\nSmaller=faster, Larger=accurate.\n'.en'=English-only."); whisper_form.addRow("Whisper Model:", self.whisper_model_combo)
-        self.whisper_status_label = QLabel(); self._update_status_label(self.whisper_status_label, WHISPER_AVAILABLE, "openai-whisper library & ffmpeg")
-        whisper_status_layout.addWidget(QLabel("Status:")); whisper_status_layout.addWidget(self.whisper_status_label); whisper_status_layout.addStretch()
-        whisper_form.addRow(whisper_status_layout); layout.addWidget(whisper_group)
+        self.whisper_status_label = self._add_status_row(whisper_form, WHISPER_AVAILABLE, "openai-whisper library & ffmpeg"); layout.addWidget(whisper_group)
         # --- Spell Check ---
         spell_group=QGroupBox("Spell & Grammar Check"); spell_form=QFormLayout(spell_group); spell_form.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapLongRows)
-        spell_h_layout = QHBoxLayout(); spell_status_layout = QHBoxLayout()
+        spell_h_layout = QHBoxLayout()
         self.spellcheck_combo=QComboBox(); available=["none"]; eng_map = {}
-        if shutil.which('aspell'): available.append("aspell"); eng_map["aspell"] = True
+        if _binary_available('aspell'): available.append("aspell"); eng_map["aspell"] = True
         else: eng_map["aspell"] = False
         if HUNSPELL_AVAILABLE: available.append("hunspell"); eng_map["hunspell"] = True
         else: eng_map["hunspell"] = False
         if LANGUAGETOOL_AVAILABLE: available.append("languagetool"); eng_map["languagetool"] = True
         else: eng_map["languagetool"] = False
-        self.spellcheck_combo.addItems(available); self.spellcheck_combo.setToolTip("Select spell/grammar engine.")
+        self.spellcheck_combo.addItems(available); self.spellcheck_combo._text_index = {name: i for i, name in enumerate(available)}; self.spellcheck_combo.setToolTip("Select spell/grammar engine.")
         spell_h_layout.addWidget(self.spellcheck_combo)
-        self.spell_status_label = QLabel(); spell_status_layout.addWidget(QLabel("Status:")); spell_status_layout.addWidget(self.spell_status_label); spell_status_layout.addStretch()
+        spell_form.addRow("Checker Engine:", spell_h_layout)
+        self.spell_status_label = self._add_status_row(spell_form) # Filled by _update_spellcheck_status
         self.spellcheck_combo.currentTextChanged.connect(lambda text: self._update_spellcheck_status(eng_map.get(text, text == "none"))) # Update status on change
-        spell_form.addRow("Checker Engine:", spell_h_layout); spell_form.addRow(spell_status_layout); layout.addWidget(spell_group); layout.addStretch(1)
+        layout.addWidget(spell_group); layout.addStretch(1)
+
+    def _add_path_row(self, form: QFormLayout, label: str, placeholder: str | None, tooltip: str, icon_name: str, browse_slot):
+        """Adds a 'path edit + browse button' row to form; returns (edit, button)."""
+        edit = QLineEdit(); edit.setToolTip(tooltip)
+        if placeholder: edit.setPlaceholderText(placeholder)
+        button = QPushButton(); button.setIcon(get_icon(icon_name)); button.setToolTip("Browse..."); button.clicked.connect(browse_slot)
+        row = QHBoxLayout(); row.addWidget(edit); row.addWidget(button); form.addRow(label, row)
+        return edit, button
+
+    def _add_status_row(self, form: QFormLayout, available: bool | None = None, requirement: str = "") -> QLabel:
+        """Adds a 'Status: <label>' row to form; the label is filled now if available is given."""
+        dot = QLabel(); label = QLabel(); label.setTextFormat(Qt.TextFormat.PlainText) # No rich-text layout per update
+        label._dot = dot
+        if available is not None: self._update_status_label(label, available, requirement)
+        row = QHBoxLayout(); row.addWidget(QLabel("Status:")); row.addWidget(dot); row.addWidget(label); row.addStretch(); form.addRow(row)
+        return label
+
+    def _set_status(self, label: QLabel, kind: str, text: str, tooltip: str):
+        """Shows the cached dot for kind ('ok'/'warn'/'off') next to plain status text."""
+        label._dot.setPixmap(_status_pixmap(kind)); label.setText(text); label.setToolTip(tooltip)
 
     def _update_status_label(self, label: QLabel, available: bool, requirement: str):
         """Updates a status label with color based on availability."""
-        if available:
-            label.setText("<font color='green'>Available</font>")
-            label.setToolTip(f"{requirement} found and appears operational.")
-        else:
-            label.setText("<font color='orange'>Not Available</font>")
-            label.setToolTip(f"{requirement} not found or failed to initialize. Please install/configure.")
+        if available: self._set_status(label, "ok", "Available", f"{requirement} found and appears operational.")
+        else: self._set_status(label, "warn", "Not Available", f"{requirement} not found or failed to initialize. Please install/configure.")
 
     def _update_spellcheck_status(self, available: bool):
         """Specific update for spellcheck status label."""
-        if self.spellcheck_combo.currentText() == "none":
-             self.spell_status_label.setText("<font color='gray'>Disabled</font>")
-             self.spell_status_label.setToolTip("Spellcheck is disabled.")
-        elif available:
-            self.spell_status_label.setText("<font color='green'>Available</font>")
-            self.spell_status_label.setToolTip(f"{self.spellcheck_combo.currentText()} backend found.")
-        else:
-            self.spell_status_label.setText("<font color='orange'>Not Available</font>")
-            self.spell_status_label.setToolTip(f"{self.spellcheck_combo.currentText()} backend not found or not functional. Please install/configure.")
-
-    def create_cloud_tab(self):
-        tab=QWidget(); layout=QVBoxLayout(tab); self.tab_widget.addTab(tab,load_icon("cloud","network-server"),"Cloud Sync")
+        engine = self.spellcheck_combo.currentText()
+        if engine == "none": self._set_status(self.spell_status_label, "off", "Disabled", "Spellcheck is disabled.")
+        elif available: self._set_status(self.spell_status_label, "ok", "Available", f"{engine} backend found.")
+        else: self._set_status(self.spell_status_label, "warn", "Not Available", f"{engine} backend not found or not functional. Please install/configure.")
+
+    def create_cloud_tab(self, tab: QWidget):
+        layout=QVBoxLayout(tab)
         cloud_group=QGroupBox("Google Drive Integration"); cloud_form=QFormLayout(cloud_group); cloud_form.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapLongRows)
-        self.gdrive_secret_edit=QLineEdit(); self.gdrive_secret_edit.setPlaceholderText("Path to client_secret.json"); self.gdrive_secret_edit.setToolTip("Path to Google client_secret.json.")
-        self.gdrive_secret_button=QPushButton(); self.gdrive_secret_button.setIcon(load_icon("document-open")); self.gdrive_secret_button.setToolTip("Browse..."); self.gdrive_secret_button.clicked.connect(self._browse_gdrive_secret)
-        secret_layout=QHBoxLayout(); secret_layout.addWidget(self.gdrive_secret_edit); secret_layout.addWidget(self.gdrive_secret_button); cloud_form.addRow("Client Secret Path:",secret_layout)
+        self.gdrive_secret_edit, self.gdrive_secret_button = self._add_path_row(
+            cloud_form, "Client Secret Path:", "Path to client_secret.json", "Path to Google client_secret.json.", "document-open", self._browse_gdrive_secret)
         gdrive_info=QLabel("Requires Google libs & Drive API."); cloud_form.addRow(gdrive_info); cloud_form.addRow(QLabel("-"*40))
         self.clear_token_button=QPushButton("Clear Google Auth Token"); self.clear_token_button.setToolTip("Forces re-authentication."); self.clear_token_button.clicked.connect(self._clear_gdrive_token); cloud_form.addRow(self.clear_token_button)
         layout.addWidget(cloud_group); layout.addStretch(1)
 
     def load_settings(self):
-        use_system = settings_manager.get("use_system_theme")
+        """Loads current settings into the fields of every built tab."""
+        self._settings = settings_manager.snapshot() # Explicit reload: re-read once, shared by all loaders
+        for tab, load, _ in self._built_tabs: self._load_tab(tab, load, self._settings)
+        for key, _, getter in self._fields(): self._mark_dirty(key, getter()) # One pass instead of one per setter
+
+    def _load_tab(self, tab: QWidget, load, s: dict):
+        """Runs a tab's loader without marking the fields it fills as dirty."""
+        self._loading = True # One flag instead of a QSignalBlocker per descendant widget
+        try: load(s)
+        finally: self._loading = False
+
+    def _load_appearance(self, s):
+        use_system = s["use_system_theme"]
         self.system_theme_check.setChecked(use_system)
-        self.theme_combo.setCurrentText(settings_manager.get("theme"))
+        self.theme_combo.setCurrentText(s["theme"])
         self.theme_combo.setDisabled(use_system) # Initial disabled state
 
-        font=settings_manager.get_font(); self.font_combo.setCurrentFont(font); self.font_size_spin.setValue(font.pointSize()); self.language_edit.setText(settings_manager.get("language"))
-        self.default_save_path_edit.setText(settings_manager.get("default_save_path")); self.autosave_spin.setValue(settings_manager.get("autosave_interval_sec")); self.session_restore_check.setChecked(settings_manager.get("session_restore"))
-        self.notebook_path_display.setText(settings_manager.get("notebook_data_file")); self.notebook_path_display.setToolTip(settings_manager.get("notebook_data_file"))
-        self.session_path_display.setText(settings_manager.get("last_session_file")); self.session_path_display.setToolTip(settings_manager.get("last_session_file"))
-        self.gdrive_map_path_display.setText(settings_manager.get("gdrive_note_map_file")); self.gdrive_map_path_display.setToolTip(settings_manager.get("gdrive_note_map_file"))
-        self.gdrive_token_path_display.setText(settings_manager.get("google_credentials_path")); self.gdrive_token_path_display.setToolTip(settings_manager.get("google_credentials_path"))
-        # Load Audio
-        in_desc = settings_manager.get("audio_input_device"); idx = self.audio_input_combo.findData(in_desc); self.audio_input_combo.setCurrentIndex(idx if idx != -1 else 0)
-        out_desc = settings_manager.get("audio_output_device"); idx = self.audio_output_combo.findData(out_desc); self.audio_output_combo.setCurrentIndex(idx if idx != -1 else 0)
-        # Load AI
-        self.llm_path_edit.setText(settings_manager.get("llm_model_path"))
-        self.whisper_model_combo.setCurrentText(settings_manager.get("whisper_model_version"))
-        spell_engine = settings_manager.get("spellcheck_engine")
-        if self.spellcheck_combo.findText(spell_engine) == -1: spell_engine = "none"; settings_manager.set("spellcheck_engine", "none")
-        self.spellcheck_combo.setCurrentText(spell_engine)
+    def _load_editor(self, s):
+        font=settings_manager.get_font(); self.font_combo.setCurrentFont(font); self.font_size_spin.setValue(font.pointSize()); self.language_edit.setText(s["language"])
+
+    def _load_files(self, s):
+        self.default_save_path_edit.setText(s["default_save_path"]); self.autosave_spin.setValue(s["autosave_interval_sec"]); self.session_restore_check.setChecked(s["session_restore"])
+        for line, key in ((self.notebook_path_display, "notebook_data_file"), (self.session_path_display, "last_session_file"),
+                          (self.gdrive_map_path_display, "gdrive_note_map_file"), (self.gdrive_token_path_display, "google_credentials_path")):
+            line.setText(s[key]); line.setToolTip(s[key])
+
+    def _load_audio(self, s):
+        self.audio_input_combo.setCurrentIndex(self._audio_device_index(self.audio_input_combo, s["audio_input_device"]))
+        self.audio_output_combo.setCurrentIndex(self._audio_device_index(self.audio_output_combo, s["audio_output_device"]))
+
+    def _load_ai(self, s):
+        self.llm_path_edit.setText(s["llm_model_path"])
+        self.whisper_model_combo.setCurrentText(s["whisper_model_version"])
+        spell_engine = s["spellcheck_engine"]
+        idx = self.spellcheck_combo._text_index.get(spell_engine)
+        if idx is None: idx = 0; settings_manager.set("spellcheck_engine", "none"); s["spellcheck_engine"] = "none" # "none" is always first
+        self.spellcheck_combo.setCurrentIndex(idx)
         self._update_spellcheck_status(self.spellcheck_combo.currentText() != "none") # Update initial status
-        # Load Cloud
-        self.gdrive_secret_edit.setText(settings_manager.get("google_client_secret_path"))
+
+    def _load_cloud(self, s):
+        self.gdrive_secret_edit.setText(s["google_client_secret_path"])
 
     def apply_settings(self):
-        print("Applying settings..."); current_values = self._get_current_field_values(); changed = []
-        def check_set(key, val): # Helper
-            if self._initial_settings.get(key) != val: settings_manager.set(key, val); changed.append(key)
-
-        check_set("use_system_theme", current_values["use_system_theme"])
-        check_set("theme", current_values["theme"])
-        new_font=self.font_combo.currentFont(); new_font.setPointSize(self.font_size_spin.value())
-        if new_font != settings_manager.get_font(): settings_manager.set_font(new_font); changed.extend(["font_family", "font_size"])
-        check_set("language", current_values["language"])
-        check_set("default_save_path", current_values["default_save_path"])
-        check_set("autosave_interval_sec", current_values["autosave_interval_sec"])
-        check_set("session_restore", current_values["session_restore"])
-        check_set("audio_input_device", current_values["audio_input_device"])
-        check_set("audio_output_device", current_values["audio_output_device"])
-        check_set("llm_model_path", current_values["llm_model_path"])
-        check_set("whisper_model_version", current_values["whisper_model_version"])
-        check_set("spellcheck_engine", current_values["spellcheck_engine"])
-        check_set("google_client_secret_path", current_values["google_client_secret_path"])
+        changed = []
+        # Only fields that differ from the initial values are read and written
+        values = {key: getter() for key, _, getter in self._fields() if key in self._dirty_keys}
+
+        if "font_family" in values or "font_size" in values: # Dirty already means it differs; no QFont compare needed
+            new_font=self.font_combo.currentFont(); new_font.setPointSize(self.font_size_spin.value())
+            settings_manager.set_font(new_font); changed.extend(["font_family", "font_size"])
+            self._settings["font_family"] = new_font.family(); self._settings["font_size"] = new_font.pointSize()
+        for key, val in values.items():
+            if key in ("font_family", "font_size"): continue # Written together via set_font above
+            settings_manager.set(key, val); changed.append(key); self._settings[key] = val # Keep the snapshot current
 
         if changed:
-            print(f"Settings applied: {', '.join(changed)}"); self._store_initial_settings(); self.apply_button.setEnabled(False)
-        else: print("No settings changed.")
+            settings_manager.sync() # One flush for the whole batch
+            logger.debug("Settings applied: %s", ", ".join(changed)); self._store_initial_settings(); self.apply_button.setEnabled(False)
 
     # --- File/Directory Browsing Helpers ---
     def _browse_file(self, caption, current_path, filter_str):
-        dir_=os.path.dirname(current_path) if current_path and os.path.isdir(os.path.dirname(current_path)) else QDir.homePath()
-        fpath, _ = QFileDialog.getOpenFileName(self, caption, dir_, filter_str); return fpath
+        dir_ = os.path.dirname(current_path) if current_path else ""
+        if not (dir_ and os.path.isdir(dir_)): dir_ = _home_path()
+        fpath, _ = QFileDialog.getOpenFileName(self, caption, dir_, filter_str, options=QFileDialog.Option.DontUseCustomDirectoryIcons); return fpath
     def _browse_directory(self, caption, current_path):
-        dir_ = current_path if current_path and os.path.isdir(current_path) else QDir.homePath()
-        dpath = QFileDialog.getExistingDirectory(self, caption, dir_, QFileDialog.Option.ShowDirsOnly); return dpath
+        dir_ = current_path if current_path and os.path.isdir(current_path) else _home_path()
+        # Native dialog (no DontUseNativeDialog); skip symlink resolution on slow/network homes
+        dpath = QFileDialog.getExistingDirectory(self, caption, dir_, QFileDialog.Option.ShowDirsOnly | QFileDialog.Option.DontResolveSymlinks); return dpath
     def _browse_llm_path(self):
-        if fpath:=self._browse_file("Select LLM Model",self.llm_path_edit.text(),"GGUF(*.gguf);;All(*)"): self.llm_path_edit.setText(fpath); self._on_setting_changed()
+        if fpath:=self._browse_file("Select LLM Model",self.llm_path_edit.text(),"GGUF(*.gguf);;All(*)"): self.llm_path_edit.setText(fpath) # textChanged marks it dirty
     def _browse_gdrive_secret(self):
-        if fpath:=self._browse_file("Select Client Secret",self.gdrive_secret_edit.text(),"JSON(*.json);;All(*)"): self.gdrive_secret_edit.setText(fpath); self._on_setting_changed()
+        if fpath:=self._browse_file("Select Client Secret",self.gdrive_secret_edit.text(),"JSON(*.json);;All(*)"): self.gdrive_secret_edit.setText(fpath) # textChanged marks it dirty
     def _browse_default_save_path(self):
-        if dpath:=self._browse_directory("Select Default Save Dir",self.default_save_path_edit.text()): self.default_save_path_edit.setText(dpath); self._on_setting_changed()
+        if dpath:=self._browse_directory("Select Default Save Dir",self.default_save_path_edit.text()): self.default_save_path_edit.setText(dpath) # textChanged marks it dirty
 
     def _clear_gdrive_token(self):
         token_path = settings_manager.get("google_credentials_path")
         if token_path and os.path.exists(token_path):
             confirm = QMessageBox.question(self,"Confirm Clear","Delete GDrive token?",QMessageBox.StandardButton.Yes|QMessageBox.StandardButton.No,QMessageBox.StandardButton.No)
             if confirm == QMessageBox.StandardButton.Yes:
-                try: os.remove(token_path); self.gdrive_token_path_display.setText("(Cleared)"); QMessageBox.information(self,"Token Cleared","Token cleared.")
-                except OSError as e: print(f"Err remove token: {e}"); QMessageBox.critical(self,"Error",f"Cannot remove token:\n{e}")
+                try:
+                    os.remove(token_path)
+                    if hasattr(self, "gdrive_token_path_display"): self.gdrive_token_path_display.setText("(Cleared)") # Files tab may not be built yet
+                    QMessageBox.information(self,"Token Cleared","Token cleared.")
+                except OSError as e: logger.exception("Failed to remove token"); QMessageBox.critical(self,"Error",f"Cannot remove token:\n{e}")
         else: QMessageBox.information(self,"Clear Token","No token file found.")